@@ -1,2 +1,2 @@
-# JobSevak - Lokal Job Assistant Chatbot
+# JobSevak - Lokal Job Assistant Chatbot
 # Package initialization file 
\ No newline at end of file
@@ -0,0 +1,83 @@
+import os
+
+import requests
+
+from history import ConversationHistory
+from streaming import iter_sse_tokens
+
+# Base URL of a running api_server.py; when set, the Streamlit UI is a thin client of it
+API_URL = os.getenv("JOBSEVAK_API_URL", "")
+# Seconds to wait for the server to accept a request, and between streamed tokens
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 120
+
+
+class ApiChatClient:
+    """
+    Stands in for JobChatBot in the Streamlit UI when the chat engine runs in the API
+    server (api_server.py): turns are sent to the server, which keeps the conversation
+    for the prompt; `history` is a local copy of the messages for display.
+    """
+
+    def __init__(self, base_url=API_URL, session_id=None):
+        self.base_url = base_url.rstrip("/")
+        self.session_id = session_id
+        self.history = ConversationHistory()
+        self._http = requests.Session()
+        self._ready = None
+
+    def missing_token(self):
+        """
+        True when the server reports that it can't reach the model (no API token).
+        """
+        if self._ready is None:
+            try:
+                response = self._http.get(f"{self.base_url}/health", timeout=CONNECT_TIMEOUT)
+                response.raise_for_status()
+                self._ready = response.json().get("ready", False)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"Could not reach the JobSevak API at {self.base_url}: {e}")
+                return False  # let the turn report the connection error
+        return not self._ready
+
+    def chat(self, user_message):
+        try:
+            response = self._http.post(f"{self.base_url}/chat", json=self._request(user_message),
+                                       timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+            response.raise_for_status()
+            body = response.json()
+            self.session_id = body["session_id"]
+            reply = body["response"]
+        except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+            reply = f"Network issue connecting to the JobSevak API: {str(e)}. Please try again later."
+        self._record(user_message, reply)
+        return reply
+
+    def chat_stream(self, user_message):
+        """
+        Like chat(), but yields the reply piece by piece as the server streams it.
+        """
+        pieces = []
+        try:
+            with self._http.post(f"{self.base_url}/chat", json=self._request(user_message, stream=True),
+                                 stream=True, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)) as response:
+                response.raise_for_status()
+                self.session_id = response.headers.get("X-Session-Id", self.session_id)
+                for piece in iter_sse_tokens(response):
+                    pieces.append(piece)
+                    yield piece
+        except (requests.exceptions.RequestException, ValueError) as e:
+            piece = f"Network issue connecting to the JobSevak API: {str(e)}. Please try again later."
+            pieces.append(piece)
+            yield piece
+        self._record(user_message, "".join(pieces).strip())
+
+    def _request(self, user_message, stream=False):
+        request = {"message": user_message, "stream": stream}
+        if self.session_id:
+            request["session_id"] = self.session_id
+        return request
+
+    def _record(self, user_message, reply):
+        self.history.add("user", user_message)
+        self.history.add("assistant", reply)
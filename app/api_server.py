@@ -0,0 +1,275 @@
+"""
+HTTP/JSON API for the chat engine, served by several worker processes.
+
+The coordinating process loads the data files once, publishes the parsed snapshot to a
+file under the state directory (see shared_snapshot.py) and forks the workers, which all
+accept connections on one listening socket. Workers start on the snapshot inherited from
+the coordinator, whose pages stay shared until written to, and share the response cache
+and conversation sessions through sqlite files in WAL mode, so any worker can answer any
+session's next turn. When the data files change, the coordinator publishes a new snapshot
+and each worker loads it from the file: only its NumPy columns are mapped and shared, the
+Python objects (lookup dictionaries, ids, text) are rebuilt in every worker.
+
+Endpoints:
+    POST   /chat                {"message": "...", "session_id": "...", "stream": false}
+           -> {"session_id": "...", "response": "..."}; with "stream": true the reply
+           is sent as server-sent events in the text-generation-inference format.
+    GET    /sessions/<id>       -> the session's messages
+    DELETE /sessions/<id>
+    GET    /health
+
+Usage: python app/api_server.py --workers 4 --port 8500
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from chatbot import JobChatBot
+from data_store import BASE_DIR, DATA_DIR, POLL_SECONDS, DataStore
+from inference_backend import get_backend
+from response_cache import ResponseCache
+from session_store import SessionStore
+from shared_snapshot import SharedDataStore, publish_snapshot
+
+API_HOST = os.getenv("JOBSEVAK_API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("JOBSEVAK_API_PORT", "8500"))
+API_WORKERS = int(os.getenv("JOBSEVAK_API_WORKERS", str(os.cpu_count() or 1)))
+# Published snapshots and the shared sqlite files live here
+STATE_DIR = os.getenv("JOBSEVAK_STATE_DIR", os.path.join(os.path.dirname(BASE_DIR), "state"))
+# Longest accepted request body and chat message
+MAX_BODY_BYTES = 64 * 1024
+MAX_MESSAGE_CHARS = 2000
+
+
+class ChatService:
+    """
+    Runs chat turns for the API: each request gets a JobChatBot with the session's
+    history restored from `sessions`, and the updated history is saved after the reply.
+    """
+
+    def __init__(self, data, response_cache, sessions, hf_api_token=None, backend=None):
+        self.data = data
+        self.response_cache = response_cache
+        self.sessions = sessions
+        self.hf_api_token = hf_api_token
+        self.backend = backend if backend is not None and not isinstance(backend, str) else get_backend(backend)
+
+    def bot(self, session_id):
+        bot = JobChatBot(self.hf_api_token, response_cache=self.response_cache, data=self.data, backend=self.backend)
+        state = self.sessions.get(session_id)
+        if state is not None:
+            bot.history.restore(state)
+        return bot
+
+    def chat(self, session_id, message):
+        bot = self.bot(session_id)
+        response = bot.chat(message)
+        self.sessions.put(session_id, bot.history.state())
+        return response
+
+    def chat_stream(self, session_id, message):
+        bot = self.bot(session_id)
+        try:
+            yield from bot.chat_stream(message)
+        finally:
+            self.sessions.put(session_id, bot.history.state())
+
+    def ready(self):
+        """
+        False when the backend needs the Hugging Face API token and none was given.
+        """
+        return not (self.backend.requires_token and not self.hf_api_token)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "JobSevakAPI/1.0"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def do_GET(self):
+        if self.path == "/health":
+            snapshot = self.service.data.snapshot
+            self._send_json(200, {"status": "ok", "pid": os.getpid(), "ready": self.service.ready(),
+                                  "data_version": snapshot.version, "generation": snapshot.generation,
+                                  "jobs": len(snapshot.job_index)})
+        elif self.path.startswith("/sessions/"):
+            state = self.service.sessions.get(self.path[len("/sessions/"):])
+            if state is None:
+                self._send_json(404, {"error": "Unknown session"})
+            else:
+                self._send_json(200, {"messages": state["messages"], "total": state["total"]})
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_DELETE(self):
+        if self.path.startswith("/sessions/"):
+            self.service.sessions.delete(self.path[len("/sessions/"):])
+            self._send_json(200, {"deleted": True})
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path != "/chat":
+            self._send_json(404, {"error": "Not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length > MAX_BODY_BYTES:
+                raise ValueError("Request body too large")
+            request = json.loads(self.rfile.read(length) or b"{}")
+            message = request.get("message")
+            if not isinstance(message, str) or not message.strip():
+                raise ValueError("'message' must be a non-empty string")
+            if len(message) > MAX_MESSAGE_CHARS:
+                raise ValueError(f"'message' is longer than {MAX_MESSAGE_CHARS} characters")
+        except (ValueError, AttributeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        session_id = str(request.get("session_id") or uuid.uuid4().hex)
+        if not request.get("stream"):
+            self._send_json(200, {"session_id": session_id, "response": self.service.chat(session_id, message)})
+            return
+
+        # HTTP/1.0: the stream ends when the connection closes, no chunked encoding needed
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("X-Session-Id", session_id)
+        self.end_headers()
+        try:
+            for piece in self.service.chat_stream(session_id, message):
+                event = {"token": {"text": piece, "special": False}}
+                self.wfile.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client went away; the turn is still saved
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class APIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, service, listener=None, address=(API_HOST, API_PORT)):
+        """
+        Serve `service` on `listener` (an already listening socket, shared with other
+        workers) or, without one, on a new socket bound to `address`.
+        """
+        super().__init__(address, _Handler, bind_and_activate=listener is None)
+        if listener is not None:
+            self.socket.close()
+            self.socket = listener
+            self.server_address = listener.getsockname()
+        self.service = service
+
+
+def shared_paths(state_dir=STATE_DIR):
+    """
+    (snapshot directory, response cache file, session file) under `state_dir`.
+    The response cache honours JOBSEVAK_CACHE_PATH when it is set.
+    """
+    return (os.path.join(state_dir, "snapshots"),
+            os.getenv("JOBSEVAK_CACHE_PATH") or os.path.join(state_dir, "responses.sqlite3"),
+            os.path.join(state_dir, "sessions.sqlite3"))
+
+
+def _run_worker(listener, state_dir, snapshot=None, snapshot_name=None):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the coordinator handles Ctrl-C and stops the workers
+    snapshot_dir, cache_path, session_path = shared_paths(state_dir)
+    store = SharedDataStore(snapshot_dir, snapshot, snapshot_name)
+    store.start_watching()
+    service = ChatService(store, ResponseCache(path=cache_path), SessionStore(session_path),
+                          hf_api_token=os.getenv("HF_API_TOKEN"))
+    APIServer(service, listener).serve_forever()
+
+
+def serve(host=API_HOST, port=API_PORT, workers=API_WORKERS, data_dir=DATA_DIR, state_dir=STATE_DIR):
+    """
+    Load the data, publish the shared snapshot and run `workers` worker processes until
+    interrupted, restarting any that die. Needs fork(); elsewhere run one worker instead.
+    """
+    snapshot_dir, _, _ = shared_paths(state_dir)
+    store = DataStore(data_dir)
+    snapshot_name = os.path.basename(publish_snapshot(store.snapshot, snapshot_dir))
+    published = store.generation
+
+    listener = socket.create_server((host, port), backlog=128)
+    print(f"JobSevak API on http://{host}:{listener.getsockname()[1]} with {workers} workers "
+          f"({len(store.snapshot.job_index)} jobs)")
+    if "fork" not in multiprocessing.get_all_start_methods():
+        _run_worker(listener, state_dir, store.snapshot, snapshot_name)
+        return
+
+    context = multiprocessing.get_context("fork")
+    processes = []
+
+    def start_worker():
+        # Workers serve the inherited snapshot until the next publish. Freezing moves it out
+        # of the collector's reach, so collections in the worker don't write to (and copy)
+        # the pages it shares with the coordinator
+        gc.freeze()
+        process = context.Process(target=_run_worker, args=(listener, state_dir, store.snapshot, snapshot_name),
+                                  name="jobsevak-api-worker")
+        process.start()
+        return process
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        processes = [start_worker() for _ in range(workers)]
+        while True:
+            time.sleep(POLL_SECONDS or 1.0)
+            if POLL_SECONDS:
+                store.reload_if_changed()
+            if store.generation != published:
+                snapshot_name = os.path.basename(publish_snapshot(store.snapshot, snapshot_dir))
+                published = store.generation
+                print(f"Published data generation {published}")
+            for i, process in enumerate(processes):
+                if not process.is_alive():
+                    print(f"Worker {process.pid} exited with {process.exitcode}; restarting")
+                    processes[i] = start_worker()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+        listener.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the JobSevak chat engine as an HTTP/JSON API.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=API_WORKERS)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--state-dir", default=STATE_DIR)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.data_dir, args.state_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import weakref
+
+import aiohttp
+
+from inference_client import (CONNECT_TIMEOUT, READ_TIMEOUT, MAX_RETRIES, BACKOFF_BASE,
+                              BACKOFF_MAX, CircuitBreakers, CircuitOpenError, backoff_delay)
+from metrics import get_metrics
+
+# Upstream calls allowed in flight at once per client
+MAX_CONCURRENCY = 32
+
+
+class AsyncInferenceClient:
+    """
+    asyncio counterpart of InferenceClient, built on aiohttp.
+
+    A semaphore bounds how many upstream requests run at once, every call has an overall
+    deadline (retries included), and identical in-flight requests are coalesced so
+    concurrent users sending the same prompt share one upstream call. Retry/backoff and
+    circuit-breaker behaviour match the synchronous client.
+
+    The aiohttp session is tied to the event loop it was first used on; create one
+    client per loop.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE,
+                 backoff_max=BACKOFF_MAX, breakers=None):
+        self.max_concurrency = max_concurrency
+        self.read_timeout = read_timeout
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breakers = breakers or CircuitBreakers()
+        self._session = None
+        self._semaphore = None
+        self._in_flight = {}
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+
+    def backoff(self, attempt, estimated_time=None):
+        return backoff_delay(attempt, self.backoff_base, self.backoff_max, estimated_time)
+
+    def _ensure_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def post_json(self, url, payload, api_token=None, deadline=None):
+        """
+        POST a JSON payload and return (status, parsed JSON body).
+        Raises asyncio.TimeoutError if the whole call (retries included) exceeds `deadline`
+        seconds, or aiohttp.ClientError / CircuitOpenError on connection failure.
+        """
+        key = (url, api_token, json.dumps(payload, sort_keys=True))
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._post_with_retries(url, payload, api_token))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced_calls += 1
+        # shield() so one caller hitting its deadline doesn't cancel the call others are waiting on
+        return await asyncio.wait_for(asyncio.shield(task), deadline or self.read_timeout)
+
+    def _finish(self, key, task):
+        self._in_flight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # mark as retrieved even if every waiter already gave up
+
+    async def _post_with_retries(self, url, payload, api_token):
+        session = self._ensure_session()
+        headers = {"Authorization": f"Bearer {api_token}"} if api_token else {}
+        breaker = self.breakers.get(url)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit breaker open for {url}; not calling the model API.")
+
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    self.upstream_calls += 1
+                    async with session.post(url, json=payload, headers=headers) as response:
+                        status = response.status
+                        try:
+                            body = await response.json(content_type=None)
+                        except ValueError:
+                            body = {"error": await response.text()}
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= self.max_retries:
+                    breaker.record_failure()
+                    raise
+                get_metrics().inc("jobsevak_upstream_retries_total", client="async", reason="connection")
+                await asyncio.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            except aiohttp.ClientError:
+                breaker.record_failure()
+                raise
+
+            if status == 503 and attempt < self.max_retries:
+                estimated_time = body.get('estimated_time') if isinstance(body, dict) else None
+                get_metrics().inc("jobsevak_upstream_retries_total", client="async", reason="loading")
+                await asyncio.sleep(self.backoff(attempt, estimated_time))
+                attempt += 1
+                continue
+
+            if status >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            return status, body
+
+
+_clients_by_loop = weakref.WeakKeyDictionary()
+
+
+def get_async_inference_client():
+    """
+    Return the AsyncInferenceClient for the running event loop, creating it on first use.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients_by_loop.get(loop)
+    if client is None:
+        client = _clients_by_loop[loop] = AsyncInferenceClient()
+    return client
@@ -0,0 +1,385 @@
+import io
+import os
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from inference_client import get_inference_client
+from metrics import get_metrics
+
+# Everything after capture runs on 16 kHz mono float32, what Whisper expects
+TARGET_RATE = 16000
+# Ring buffer size; older audio is overwritten (a chunk never gets anywhere near this long)
+BUFFER_SECONDS = 120
+# Voice activity detection works on frames of this length
+VAD_FRAME_MS = 30
+# Frame RMS (full scale = 1.0) that always counts as speech / never counts as speech,
+# and how far above the running noise floor a frame must be to count as speech
+SPEECH_RMS = 0.05
+SILENCE_RMS = 0.005
+NOISE_FACTOR = 3.0
+# A chunk ends after this much silence, or at MAX_CHUNK_SECONDS; chunks shorter than
+# MIN_SPEECH_MS are dropped as clicks; PAD_MS of audio is kept around each chunk
+MIN_SILENCE_MS = 600
+MAX_CHUNK_SECONDS = 20
+MIN_SPEECH_MS = 200
+PAD_MS = 150
+# Chunks transcribed at once
+TRANSCRIBE_WORKERS = 4
+# Histogram buckets for uploaded chunk sizes
+AUDIO_SIZE_BUCKETS = (4096, 16384, 65536, 262144, 1048576)
+
+# Compressed upload format: "opus" (needs the av package) or "wav"
+AUDIO_CODEC = os.getenv("JOBSEVAK_AUDIO_CODEC", "opus")
+# "whisper" calls WHISPER_API_URL; "stub" transcribes offline (for tests and demos)
+TRANSCRIBER = os.getenv("JOBSEVAK_TRANSCRIBER", "whisper")
+WHISPER_API_URL = "https://api-inference.huggingface.co/models/openai/whisper-large-v3"
+
+
+def to_mono(samples, channels=1, planar=False):
+    """
+    Downmix a block of PCM samples to mono float32 in [-1, 1].
+
+    `samples` is what av.AudioFrame.to_ndarray() returns: shape (channels, n) for planar
+    formats, (1, n * channels) interleaved for packed ones. Integer samples are scaled
+    to full scale.
+    """
+    samples = np.asarray(samples)
+    if planar or channels == 1:
+        mono = samples.reshape(channels, -1).mean(axis=0, dtype=np.float32)
+    else:
+        mono = samples.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+    if np.issubdtype(samples.dtype, np.integer):
+        mono /= float(np.iinfo(samples.dtype).max + 1)
+    return mono
+
+
+class Resampler:
+    """
+    Streaming resampler to TARGET_RATE.
+
+    Integer ratios (48 kHz -> 16 kHz) average each group of samples, which doubles as the
+    anti-aliasing filter; other rates use linear interpolation. Samples that don't fill a
+    whole group are carried over to the next block, so block boundaries are seamless.
+    """
+
+    def __init__(self, source_rate, target_rate=TARGET_RATE):
+        self.source_rate = source_rate
+        self.target_rate = target_rate
+        self._carry = np.zeros(0, dtype=np.float32)
+        self._position = 0.0  # next output sample's position in source samples (interpolation)
+
+    def __call__(self, samples):
+        if self.source_rate == self.target_rate:
+            return samples
+        samples = np.concatenate((self._carry, samples)) if len(self._carry) else samples
+        ratio = self.source_rate / self.target_rate
+        if ratio == int(ratio):
+            step = int(ratio)
+            usable = len(samples) - len(samples) % step
+            self._carry = samples[usable:].copy()
+            return samples[:usable].reshape(-1, step).mean(axis=1)
+        # Output positions falling inside this block (the last sample is kept to interpolate from)
+        positions = np.arange(self._position, len(samples) - 1, ratio)
+        output = np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+        next_position = self._position + len(positions) * ratio
+        keep_from = min(int(next_position), len(samples))
+        self._carry = samples[keep_from:].copy()
+        self._position = next_position - keep_from
+        return output
+
+
+class AudioRingBuffer:
+    """
+    Preallocated circular buffer of float32 samples addressed by absolute sample index
+    (samples written since the start). Writes never allocate; the oldest audio is
+    overwritten once `capacity` samples have been written.
+    """
+
+    def __init__(self, capacity):
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self.written = 0
+
+    @property
+    def capacity(self):
+        return len(self._data)
+
+    def write(self, samples):
+        samples = samples[-self.capacity:]
+        start = self.written % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self._data[start:start + first] = samples[:first]
+        self._data[:len(samples) - first] = samples[first:]
+        self.written += len(samples)
+
+    def read(self, start, end):
+        """
+        Copy of samples [start, end); clipped to what is still in the buffer.
+        """
+        start = max(start, self.written - self.capacity, 0)
+        end = min(end, self.written)
+        if end <= start:
+            return np.zeros(0, dtype=np.float32)
+        first, last = start % self.capacity, end % self.capacity
+        if first < last or last == 0:
+            return self._data[first:last or None].copy()
+        return np.concatenate((self._data[first:], self._data[:last]))
+
+    def clear(self):
+        self.written = 0
+
+
+class VoiceActivityDetector:
+    """
+    Energy-based VAD that cuts a 16 kHz stream into speech chunks.
+
+    Each VAD_FRAME_MS frame's RMS is compared with a threshold that follows the noise
+    floor (between SILENCE_RMS and SPEECH_RMS). A chunk starts at the first speech frame
+    and ends after MIN_SILENCE_MS of silence or MAX_CHUNK_SECONDS, so leading and trailing
+    silence is trimmed. feed() returns the (start, end) sample ranges of finished chunks.
+    """
+
+    def __init__(self, rate=TARGET_RATE):
+        self.frame = rate * VAD_FRAME_MS // 1000
+        self.silence_frames = MIN_SILENCE_MS // VAD_FRAME_MS
+        self.max_frames = MAX_CHUNK_SECONDS * 1000 // VAD_FRAME_MS
+        self.min_frames = MIN_SPEECH_MS // VAD_FRAME_MS
+        self.pad = rate * PAD_MS // 1000
+        self.noise_floor = SILENCE_RMS
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._frames_seen = 0
+        self._chunk_start = None   # frame index of the open chunk's first speech frame
+        self._last_speech = None
+        self._speech_frames = 0
+
+    def feed(self, samples):
+        samples = np.concatenate((self._pending, samples)) if len(self._pending) else samples
+        count = len(samples) // self.frame
+        self._pending = samples[count * self.frame:].copy()
+        if not count:
+            return []
+        rms = np.sqrt(np.mean(np.square(samples[:count * self.frame].reshape(count, self.frame)), axis=1))
+
+        chunks = []
+        for offset, level in enumerate(rms):
+            index = self._frames_seen + offset
+            threshold = min(max(self.noise_floor * NOISE_FACTOR, SILENCE_RMS), SPEECH_RMS)
+            if level >= threshold:
+                if self._chunk_start is None:
+                    self._chunk_start = index
+                    self._speech_frames = 0
+                self._last_speech = index
+                self._speech_frames += 1
+            else:
+                # Track the noise floor on quiet frames only (slow rise, fast fall)
+                self.noise_floor = min(level, 0.95 * self.noise_floor + 0.05 * level) if level else self.noise_floor
+            if self._chunk_start is not None and (index - self._last_speech >= self.silence_frames
+                                                 or index - self._chunk_start + 1 >= self.max_frames):
+                chunks.extend(self._close())
+        self._frames_seen += count
+        return chunks
+
+    def flush(self):
+        """
+        Close the open chunk at the end of the recording.
+        """
+        return self._close() if self._chunk_start is not None else []
+
+    def _close(self):
+        start, end, speech = self._chunk_start, self._last_speech + 1, self._speech_frames
+        self._chunk_start = self._last_speech = None
+        if speech < self.min_frames:
+            return []
+        return [(max(start * self.frame - self.pad, 0), end * self.frame + self.pad)]
+
+
+def encode_wav(samples, rate=TARGET_RATE):
+    """
+    16-bit mono WAV bytes for float samples in [-1, 1].
+    """
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2')
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(rate)
+        wav_file.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def encode_opus(samples, rate=TARGET_RATE):
+    """
+    Ogg/Opus bytes via the av package (several times smaller than WAV for speech).
+    """
+    import av
+
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    buffer = io.BytesIO()
+    with av.open(buffer, mode="w", format="ogg") as container:
+        stream = container.add_stream("libopus", rate=rate)
+        frame = av.AudioFrame.from_ndarray(pcm.reshape(1, -1), format="s16", layout="mono")
+        frame.sample_rate = rate
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buffer.getvalue()
+
+
+def encode_audio(samples, codec=AUDIO_CODEC, rate=TARGET_RATE):
+    """
+    Encode a chunk for upload. Returns (bytes, filename, mime type); falls back to WAV
+    when `codec` is "opus" but av (or its libopus encoder) is unavailable.
+    """
+    if codec == "opus":
+        try:
+            return encode_opus(samples, rate), "audio.ogg", "audio/ogg"
+        except Exception as e:
+            print(f"Opus encoding unavailable ({e}); sending WAV.")
+    return encode_wav(samples, rate), "audio.wav", "audio/wav"
+
+
+class TranscriptionError(Exception):
+    """
+    Raised when a transcriber can't turn a chunk into text.
+    """
+
+
+class WhisperTranscriber:
+    """
+    Transcribes through the Hugging Face Whisper API using the shared retrying client.
+    """
+
+    def __init__(self, api_token, url=WHISPER_API_URL, language="en"):
+        self.api_token = api_token
+        self.url = url
+        self.language = language
+
+    def transcribe(self, audio_bytes, filename="audio.wav", mime_type="audio/wav"):
+        if not self.api_token:
+            raise TranscriptionError("Missing API token for voice transcription")
+        files = {"file": (filename, audio_bytes, mime_type)}
+        data = {"task": "transcribe", "language": self.language}
+        # The shared client retries 503 / model-loading replies with backoff
+        response = get_inference_client().post(self.url, api_token=self.api_token, files=files, data=data)
+        if response.status_code == 503:
+            raise TranscriptionError("Voice transcription failed after multiple attempts")
+        if response.status_code != 200:
+            raise TranscriptionError(f"Transcription API error: {response.status_code} - {response.text}")
+        return response.json().get("text", "")
+
+
+class StubTranscriber:
+    """
+    Offline transcriber: returns `replies` in turn, or describes each chunk's length.
+    """
+
+    def __init__(self, replies=None):
+        self.replies = list(replies or [])
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio_bytes, filename="audio.wav", mime_type="audio/wav"):
+        with self._lock:
+            index = self.calls
+            self.calls += 1
+        if index < len(self.replies):
+            return self.replies[index]
+        return f"[{len(audio_bytes)} bytes of {mime_type}]"
+
+
+def get_transcriber(api_token=None, name=None):
+    """
+    Transcriber selected by `name` or JOBSEVAK_TRANSCRIBER ("whisper" or "stub").
+    """
+    name = name or TRANSCRIBER
+    if name == "stub":
+        return StubTranscriber()
+    if name == "whisper":
+        return WhisperTranscriber(api_token)
+    raise ValueError(f"Unknown transcriber {name!r}; expected 'whisper' or 'stub'.")
+
+
+class AudioPipeline:
+    """
+    Streaming voice input: capture -> 16 kHz mono -> speech chunks -> transcripts.
+
+    feed() / process_frame() take raw audio blocks (e.g. WebRTC frames, on the capture
+    thread) while recording. Samples are downmixed and resampled as they arrive and
+    written into a preallocated ring buffer; the VAD cuts out speech chunks, and each
+    finished chunk is encoded and sent to the transcriber on a thread pool right away,
+    so most of the transcription is done by the time the user stops talking.
+    finish() closes the last chunk and returns the transcripts joined in order.
+    """
+
+    def __init__(self, transcriber, codec=AUDIO_CODEC, workers=TRANSCRIBE_WORKERS):
+        self.transcriber = transcriber
+        self.codec = codec
+        self.buffer = AudioRingBuffer(TARGET_RATE * BUFFER_SECONDS)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transcribe")
+        self._lock = threading.Lock()
+        self._futures = []
+        self._resampler = None
+        self._vad = VoiceActivityDetector()
+        self.recording = False
+
+    def start(self):
+        with self._lock:
+            self._reset()
+            self.recording = True
+
+    def stop(self):
+        with self._lock:
+            self.recording = False
+
+    def process_frame(self, frame):
+        """
+        av.AudioFrame callback for streamlit-webrtc; returns the frame unchanged.
+        """
+        if self.recording:
+            self.feed(frame.to_ndarray(), frame.sample_rate, len(frame.layout.channels), frame.format.is_planar)
+        return frame
+
+    def feed(self, samples, rate, channels=1, planar=False):
+        mono = to_mono(samples, channels, planar)
+        with self._lock:
+            if not self.recording:
+                return
+            if self._resampler is None or self._resampler.source_rate != rate:
+                self._resampler = Resampler(rate)
+            self._write(self._resampler(mono))
+
+    def finish(self):
+        """
+        Stop recording, wait for every chunk's transcript and return them joined.
+        Raises TranscriptionError if any chunk failed.
+        """
+        with self._lock:
+            self.recording = False
+            for chunk in self._vad.flush():
+                self._submit(*chunk)
+            futures, self._futures = self._futures, []
+        return " ".join(text.strip() for text in (future.result() for future in futures) if text.strip())
+
+    def _write(self, samples):
+        self.buffer.write(samples)
+        for chunk in self._vad.feed(samples):
+            self._submit(*chunk)
+
+    def _submit(self, start, end):
+        audio, filename, mime_type = encode_audio(self.buffer.read(start, end), self.codec)
+        self._futures.append(self._executor.submit(self._transcribe, audio, filename, mime_type))
+
+    def _transcribe(self, audio, filename, mime_type):
+        metrics = get_metrics()
+        metrics.observe("jobsevak_audio_chunk_bytes", len(audio), buckets=AUDIO_SIZE_BUCKETS)
+        with metrics.timer("transcribe"):
+            return self.transcriber.transcribe(audio, filename, mime_type)
+
+    def _reset(self):
+        self.buffer.clear()
+        self._vad = VoiceActivityDetector()
+        self._resampler = None
+        self._futures = []
@@ -1,231 +1,442 @@
-import json
-import os
-import requests # For making HTTP requests to the Inference API
-
-# Determine the base directory for data files consistently
-# This assumes chatbot.py is in the 'app' directory, and 'data' is a subdirectory of 'app'.
-BASE_DIR = os.path.dirname(os.path.abspath(__file__)) # app directory
-DATA_DIR = os.path.join(BASE_DIR, "data")
-
-# Revert to flan-t5-base as originally intended
-MODEL_API_URL = "https://api-inference.huggingface.co/models/meta-llama/Llama-3.1-8B-Instruct"
-
-class JobChatBot:
-    def __init__(self, hf_api_token=None):
-        """
-        Initialize the Job ChatBot to use Hugging Face Inference API.
-        """
-        self.hf_api_token = hf_api_token
-        if not self.hf_api_token:
-            # This print is mostly for server-side logging if needed, Streamlit UI shows errors too.
-            print("CRITICAL_CHATBOT_INIT: Hugging Face API Token not provided to JobChatBot constructor.")
-
-        self.conversation_history = []
-        self.load_data()
-        self.model = True # Placeholder
-        self.tokenizer = True # Placeholder
-        
-    def load_data(self):
-        """
-        Load FAQs, mock jobs, and cities data from JSON files.
-        """
-        try:
-            with open(os.path.join(DATA_DIR, 'faqs.json'), 'r', encoding='utf-8') as f:
-                self.faqs = json.load(f)['faqs']
-            with open(os.path.join(DATA_DIR, 'mock_jobs.json'), 'r', encoding='utf-8') as f:
-                self.jobs = json.load(f)['jobs']
-            with open(os.path.join(DATA_DIR, 'cities.json'), 'r', encoding='utf-8') as f:
-                self.cities = json.load(f)['cities']
-        except FileNotFoundError as e:
-            print(f"Error loading data file: {e}. Ensure data files are in {DATA_DIR}")
-            self.faqs, self.jobs, self.cities = [], [], []
-        except Exception as e:
-            print(f"An unexpected error occurred loading data: {e}")
-            self.faqs, self.jobs, self.cities = [], [], []
-    
-    def get_system_prompt_and_context(self, user_query):
-        """
-        Generate the prompt for the T5 model, including relevant context (FAQs, job data).
-        Modified to prevent the model from generating a simulated conversation.
-        """
-        # System instructions
-        prompt_start = """You are JobSevak, a helpful job assistant for Lokal's Jobs platform in India.
-Your task is to respond to the user's query in a helpful, concise manner.
-IMPORTANT: Only generate ONE RESPONSE as JobSevak. Do not create a simulated conversation.
-DO NOT generate any text that appears to be from the user. Only respond as the assistant.
-
-"""
-        
-        # Add context about cities
-        cities_text = ", ".join(self.cities)
-        prompt_start += f"Available cities for job search: {cities_text}.\n\n"
-        
-        # Add FAQs
-        faq_text = "\n".join([f"Q: {faq['question']}\nA: {faq['answer']}" for faq in self.faqs])
-        prompt_start += f"Reference FAQs:\n{faq_text}\n\n"
-
-        # Add job data context if relevant
-        job_data_context = self.get_job_data_context(user_query)
-        if job_data_context:
-            prompt_start += f"Relevant job listings for this query:\n{job_data_context}\n\n"
-
-        # Add conversation history
-        if self.conversation_history:
-            history_text = ""
-            for turn in self.conversation_history[-4:]:  # Last 2 exchanges
-                role = "User" if turn["role"] == "user" else "JobSevak"
-                history_text += f"{role}: {turn['content']}\n"
-            
-            prompt_start += f"Previous conversation:\n{history_text}\n"
-
-        # Add the current query with explicit instruction to only respond as JobSevak
-        final_prompt = f"{prompt_start}Current query - User: {user_query}\n\nYour response (respond ONLY as JobSevak):"
-        return final_prompt
-
-    def query_job_listings(self, location=None, job_type=None, gender_preference=None):
-        """
-        Filter job listings based on location, job type or gender preference.
-        """
-        filtered_jobs = self.jobs
-        if location:
-            filtered_jobs = [job for job in filtered_jobs if job['location'].lower() == location.lower()]
-        if job_type:
-            filtered_jobs = [job for job in filtered_jobs if job_type.lower() in job['job_type'].lower()]
-        if gender_preference:
-            filtered_jobs = [job for job in filtered_jobs if job['gender_preference'].lower() == gender_preference.lower() or job['gender_preference'].lower() == 'any']
-        return filtered_jobs
-    
-    def get_job_data_context(self, query):
-        """
-        Analyze the query to see if we need to provide job listings as context.
-        Returns relevant job data as context string if needed.
-        """
-        job_related_keywords = ['job', 'work', 'employment', 'career', 'listing', 'opportunity']
-        is_job_query = any(keyword in query.lower() for keyword in job_related_keywords)
-        if not is_job_query: return ""
-        
-        location = next((city for city in self.cities if city.lower() in query.lower()), None)
-        
-        gender_preference = None
-        if 'women' in query.lower() or 'female' in query.lower(): gender_preference = 'Female'
-        elif 'men' in query.lower() or 'male' in query.lower(): gender_preference = 'Male'
-        
-        job_type = None
-        if 'part-time' in query.lower() or 'part time' in query.lower(): job_type = 'Part-time'
-        elif 'full-time' in query.lower() or 'full time' in query.lower(): job_type = 'Full-time'
-        
-        filtered_jobs = self.query_job_listings(location, job_type, gender_preference)
-        if not filtered_jobs and location: return f"No jobs found in {location} matching your current criteria."
-        if not (location or job_type or gender_preference) and is_job_query: filtered_jobs = self.jobs[:3]
-        
-        if filtered_jobs:
-            job_context = ""
-            for job in filtered_jobs[:3]:
-                job_context += f"- Title: {job['title']}, Co: {job['company']}, Loc: {job['location']}, Sal: {job['salary']}\n"
-            return job_context
-        return ""
-    
-    def chat(self, user_message):
-        """
-        Process user message and generate response using Hugging Face Inference API.
-        """
-        if not self.hf_api_token:
-            return "I apologize, but the connection to the language model service is not configured. HF_API_TOKEN is missing. Please ensure it is set in your .env file and restart the application."
-
-        self.conversation_history.append({"role": "user", "content": user_message})
-        if len(self.conversation_history) > 6: 
-            self.conversation_history = self.conversation_history[-6:]
-        
-        prompt_for_api = self.get_system_prompt_and_context(user_message)
-        
-        headers = {"Authorization": f"Bearer {self.hf_api_token}"}
-        payload = {
-            "inputs": prompt_for_api,
-            "parameters": {
-                "max_new_tokens": 150,
-                "num_return_sequences": 1,
-                "temperature": 0.7,
-                "top_p": 0.95,
-                "do_sample": True,
-                "no_repeat_ngram_size": 2,
-                "early_stopping": True
-            },
-            "options": {
-                "wait_for_model": True # If the model is not ready, wait for it to load
-            }
-        }
-        
-        try:
-            api_response = requests.post(MODEL_API_URL, headers=headers, json=payload, timeout=30)
-            api_response.raise_for_status() # Raise an exception for bad status codes (4xx or 5xx)
-            
-            result = api_response.json()
-            response_text = ""
-            
-            if isinstance(result, list) and result:
-                response_text = result[0].get('generated_text', '')
-                
-                # If the model included prompt in response, remove it
-                if response_text.startswith(prompt_for_api):
-                    response_text = response_text[len(prompt_for_api):].strip()
-                
-                # Additional processing to find and extract only the assistant's response
-                assistant_marker = "JobSevak:"
-                user_marker = "User:"
-                
-                # If the response has "JobSevak:" markers, extract just the first part after that
-                if assistant_marker in response_text:
-                    parts = response_text.split(assistant_marker)
-                    if len(parts) > 1:
-                        # Get text after first "JobSevak:" but before any "User:" if present
-                        assistant_part = parts[1].strip()
-                        if user_marker in assistant_part:
-                            assistant_part = assistant_part.split(user_marker)[0].strip()
-                        response_text = assistant_part
-                
-                # Clean up any additional JobSevak: prefixes
-                if response_text.startswith(assistant_marker):
-                    response_text = response_text[len(assistant_marker):].strip()
-                    
-            elif isinstance(result, dict) and 'generated_text' in result:
-                response_text = result.get('generated_text', '')
-                
-                # Apply the same cleanup logic
-                assistant_marker = "JobSevak:"
-                user_marker = "User:"
-                
-                if assistant_marker in response_text:
-                    parts = response_text.split(assistant_marker)
-                    if len(parts) > 1:
-                        assistant_part = parts[1].strip()
-                        if user_marker in assistant_part:
-                            assistant_part = assistant_part.split(user_marker)[0].strip()
-                        response_text = assistant_part
-                        
-                if response_text.startswith(assistant_marker):
-                    response_text = response_text[len(assistant_marker):].strip()
-                    
-            elif isinstance(result, dict) and 'error' in result:
-                response_text = f"Model API Error: {result['error']}"
-                if 'estimated_time' in result:
-                    response_text += f" The model might be loading, estimated time: {result['estimated_time']:.2f}s."
-            else:
-                response_text = "Sorry, I received an unexpected response from the model service."
-                print(f"Unexpected API response format: {result}")
-
-            # Ensure we don't have any residual "JobSevak:" prefixes or "User:" segments
-            clean_response = response_text.strip()
-            
-            self.conversation_history.append({"role": "assistant", "content": clean_response})
-            return clean_response
-            
-        except requests.exceptions.RequestException as e:
-            error_message = f"Network issue connecting to model API: {str(e)}. Please try again later."
-            print(error_message)
-            self.conversation_history.append({"role": "assistant", "content": error_message})
-            return error_message
-        except Exception as e:
-            error_message = f"Unexpected error during API call: {str(e)}."
-            print(error_message)
-            self.conversation_history.append({"role": "assistant", "content": error_message})
-            return error_message 
\ No newline at end of file
+import asyncio
+import time
+import aiohttp
+import requests # For making HTTP requests to the Inference API
+from data_store import get_data_store
+from inference_backend import get_backend
+from streaming import StreamingResponseCleaner, clean_reply
+from response_cache import get_response_cache, make_cache_key
+from prompt_builder import PROMPT_TOKEN_BUDGET, QUERY_MAX_TOKENS, PromptBuilder, PromptSection, get_token_counter
+from metrics import SIZE_BUCKETS, get_metrics, profiled
+from history import ConversationHistory, RunningSummary
+
+# How many FAQs to put in each prompt, and the minimum BM25 score for an FAQ to count as relevant
+FAQ_TOP_K = 3
+FAQ_MIN_SCORE = 1.0
+
+# Stage timers, size histograms and counters for every turn (see metrics.py)
+metrics = get_metrics()
+
+MISSING_TOKEN_MESSAGE = "I apologize, but the connection to the language model service is not configured. HF_API_TOKEN is missing. Please ensure it is set in your .env file and restart the application."
+
+class JobChatBot:
+    def __init__(self, hf_api_token=None, faq_top_k=FAQ_TOP_K, faq_min_score=FAQ_MIN_SCORE, response_cache=None, data=None,
+                 prompt_token_budget=PROMPT_TOKEN_BUDGET, backend=None, today=None):
+        """
+        Initialize the Job ChatBot to use Hugging Face Inference API.
+        Jobs, FAQs and cities come from `data`, a DataStore shared by all sessions in the
+        process; the bot itself only keeps this user's conversation. Prompts are kept
+        within `prompt_token_budget` tokens.
+
+        `backend` is an InferenceBackend or a backend name ("remote" / "local"); by default
+        the JOBSEVAK_BACKEND setting picks the process-wide one. `today` fixes the date
+        "posted this week" and similar filters count from (default: the current date),
+        for static feeds such as the mock data and the benchmarks.
+        """
+        self.backend = backend if backend is not None and not isinstance(backend, str) else get_backend(backend)
+        self.hf_api_token = hf_api_token
+        self.data = data if data is not None else get_data_store()
+        self.response_cache = response_cache if response_cache is not None else get_response_cache()
+        self.faq_top_k = faq_top_k
+        self.faq_min_score = faq_min_score
+        self.today = today
+        if not self.hf_api_token and self.backend.requires_token:
+            # This print is mostly for server-side logging if needed, Streamlit UI shows errors too.
+            print("CRITICAL_CHATBOT_INIT: Hugging Face API Token not provided to JobChatBot constructor.")
+
+        # Shared with the UI; older turns are summarized using this bot's intent extractor
+        self.history = ConversationHistory(summary=RunningSummary(lambda text: self.intent_extractor.extract(text)))
+        self.prompt_builder = PromptBuilder(get_token_counter(), prompt_token_budget)
+        self.last_prompt_usage = {}  # tokens per prompt section in the last prompt built
+        
+    def load_data(self):
+        """
+        Reload FAQs, mock jobs, and cities data from JSON files (for every session sharing the data).
+        """
+        self.data.reload()
+
+    # Read-only views of the shared data. A turn reads them from one snapshot it takes at the
+    # start (see _begin_turn()), so a reload mid-turn can't mix old and new data
+    @property
+    def faqs(self):
+        return self.data.snapshot.faqs
+
+    @property
+    def jobs(self):
+        return self.data.snapshot.jobs
+
+    @property
+    def cities(self):
+        return self.data.snapshot.cities
+
+    @property
+    def job_index(self):
+        return self.data.snapshot.job_index
+
+    @property
+    def intent_extractor(self):
+        return self.data.snapshot.intent_extractor
+
+    @property
+    def faq_retriever(self):
+        return self.data.snapshot.faq_retriever
+
+    @property
+    def data_version(self):
+        return self.data.snapshot.version
+
+    @property
+    def conversation_history(self):
+        """
+        The buffered messages as a list, oldest first.
+        """
+        return list(self.history)
+
+    def add_job(self, job):
+        """
+        Add or replace a job listing, keeping the job index up to date.
+        """
+        self.data.add_job(job)
+
+    def remove_job(self, job_id):
+        """
+        Remove a job listing by id, keeping the job index up to date.
+        """
+        return self.data.remove_job(job_id)
+    
+    @metrics.timed("prompt_build")
+    def get_system_prompt_and_context(self, user_query, snapshot=None):
+        """
+        Generate the prompt for the T5 model, including relevant context (FAQs, job data).
+        Modified to prevent the model from generating a simulated conversation.
+
+        The prompt is kept within the bot's token budget: the instructions and the query
+        always go in, budgeted first (a query over QUERY_MAX_TOKENS is cut), then job
+        listings, FAQs, the recent turns, the summary of older turns and the city list are
+        added in that order of priority while they fit, dropping the lowest-ranked
+        listings/FAQs, the oldest turns and the last cities first. Everything comes from
+        `snapshot` (default: the current one).
+        """
+        snapshot = snapshot or self.data.snapshot
+        history = [f"{'User' if turn['role'] == 'user' else 'JobSevak'}: {turn['content']}\n"
+                   for turn in self.history.recent()]
+        sections = [
+            # Static prefix (instructions) is cached between turns
+            PromptSection("instructions", [self.get_static_prompt_prefix(snapshot)], priority=0, required=True,
+                          static=True),
+            # Cities come last in priority: the list can be long, and the query names its city anyway
+            PromptSection("cities", snapshot.cities, priority=5, static=True,
+                          header="Available cities for job search: ", separator=", ", footer=".\n\n"),
+            # Only the FAQs relevant to this query, best first
+            PromptSection("faqs", self.get_faq_items(user_query, snapshot), priority=2, static=True,
+                          header="Reference FAQs:\n", separator="\n", footer="\n\n"),
+            # Job data context if relevant
+            PromptSection("jobs", self.get_job_data_context(user_query, snapshot).splitlines(keepends=True), priority=1,
+                          static=True, header="Relevant job listings for this query:\n", footer="\n\n"),
+            PromptSection("summary", [self.history.summary.text()], priority=4,
+                          header="Earlier conversation summary: ", footer="\n\n"),
+            PromptSection("history", history, priority=3, keep="last", header="Previous conversation:\n", footer="\n"),
+            # The current query with explicit instruction to only respond as JobSevak
+            PromptSection("query", [user_query], priority=0, required=True, truncate=True, max_tokens=QUERY_MAX_TOKENS,
+                          header="Current query - User: ", footer="\n\nYour response (respond ONLY as JobSevak):"),
+        ]
+        prompt, self.last_prompt_usage = self.prompt_builder.build(sections)
+        metrics.observe("jobsevak_prompt_tokens", sum(self.last_prompt_usage.values()), SIZE_BUCKETS)
+        metrics.observe("jobsevak_prompt_bytes", len(prompt.encode("utf-8")), SIZE_BUCKETS)
+        return prompt
+
+    def get_static_prompt_prefix(self, snapshot=None):
+        """
+        Return the part of the prompt that only depends on the data files.
+        Rendered once per data snapshot; the data store's watcher swaps in a new one when files change.
+        """
+        return (snapshot or self.data.snapshot).static_prompt_prefix
+
+    @metrics.timed("faq_retrieval")
+    def get_faq_items(self, query, snapshot=None):
+        """
+        The top FAQs for the query, each formatted as a Q:/A: block, best first.
+        """
+        retriever = (snapshot or self.data.snapshot).faq_retriever
+        faqs = retriever.search(query, top_k=self.faq_top_k, min_score=self.faq_min_score)
+        return [f"Q: {faq['question']}\nA: {faq['answer']}" for faq in faqs]
+
+    def query_job_listings(self, location=None, job_type=None, gender_preference=None, limit=None,
+                           min_salary=None, max_salary=None, posted_within_days=None, keywords=()):
+        """
+        Filter job listings based on location, job type or gender preference.
+        Results keep file order; pass `limit` to stop after the first few matches.
+        With a salary range, recency or keywords, the matches are ranked instead
+        (see JobIndex.search).
+        """
+        job_index = self.job_index
+        if min_salary is None and max_salary is None and posted_within_days is None and not keywords:
+            return job_index.query(location, job_type, gender_preference, limit=limit)
+        return job_index.search(location, job_type, gender_preference, min_salary, max_salary,
+                                posted_within_days, keywords, limit=limit or len(job_index), today=self.today)
+    
+    def get_job_data_context(self, query, snapshot=None):
+        """
+        Analyze the query to see if we need to provide job listings as context.
+        Returns relevant job data as context string if needed.
+        """
+        snapshot = snapshot or self.data.snapshot
+        with metrics.timer("intent"):
+            intent = snapshot.intent_extractor.extract(query)
+        is_job_query = intent.is_job_query
+        if not is_job_query: return ""
+        
+        location, job_type, gender_preference = intent.location, intent.job_type, intent.gender
+        
+        # Ranked by keyword match, recency and salary; only the top 3 are selected
+        with metrics.timer("job_search"):
+            filtered_jobs = snapshot.job_index.search(location, job_type, gender_preference, intent.min_salary,
+                                                  intent.max_salary, intent.posted_within_days, intent.keywords, limit=3,
+                                                  today=self.today)
+        if not filtered_jobs and location: return f"No jobs found in {location} matching your current criteria."
+        if not filtered_jobs and (intent.min_salary is not None or intent.max_salary is not None
+                                  or intent.posted_within_days is not None):
+            return "No jobs found matching your current criteria."
+        
+        if filtered_jobs:
+            job_context = ""
+            for job in filtered_jobs[:3]:
+                job_context += f"- Title: {job['title']}, Co: {job['company']}, Loc: {job['location']}, Sal: {job['salary']}\n"
+            return job_context
+        return ""
+    
+    @profiled
+    @metrics.timed("turn")
+    def chat(self, user_message):
+        """
+        Process user message and generate response using the configured backend
+        (the Hugging Face Inference API by default).
+        """
+        if self.missing_token():
+            return MISSING_TOKEN_MESSAGE
+
+        snapshot, cache_key, cached = self._begin_turn(user_message)
+        if cached is not None:
+            return self._end_turn(cached)
+        
+        prompt_for_api = self.get_system_prompt_and_context(user_message, snapshot)
+        payload = self.build_payload(prompt_for_api)
+        
+        try:
+            with metrics.timer("upstream"):
+                result = self.backend.generate(payload, api_token=self.hf_api_token)
+            response_text = self.extract_response_text(result, prompt_for_api)
+
+            # Ensure we don't have any residual "JobSevak:" prefixes or "User:" segments
+            clean_response = response_text.strip()
+            if isinstance(result, dict) and 'error' in result:
+                cache_key = None
+            return self._end_turn(clean_response, cache_key)
+            
+        except requests.exceptions.RequestException as e:
+            error_message = f"Network issue connecting to model API: {str(e)}. Please try again later."
+            print(error_message)
+            metrics.inc("jobsevak_errors_total", kind="network")
+            return self._end_turn(error_message)
+        except Exception as e:
+            error_message = f"Unexpected error during API call: {str(e)}."
+            print(error_message)
+            metrics.inc("jobsevak_errors_total", kind="unexpected")
+            return self._end_turn(error_message)
+
+    @metrics.timed("turn")
+    async def achat(self, user_message, deadline=None):
+        """
+        asyncio version of chat(). With the remote backend the upstream call goes through
+        the shared AsyncInferenceClient, so it is bounded by its concurrency limit, gives up
+        after `deadline` seconds, and shares one request with identical in-flight prompts.
+        """
+        if self.missing_token():
+            return MISSING_TOKEN_MESSAGE
+
+        snapshot, cache_key, cached = self._begin_turn(user_message)
+        if cached is not None:
+            return self._end_turn(cached)
+
+        prompt_for_api = self.get_system_prompt_and_context(user_message, snapshot)
+        payload = self.build_payload(prompt_for_api)
+
+        try:
+            with metrics.timer("upstream"):
+                result = await self.backend.agenerate(payload, api_token=self.hf_api_token, deadline=deadline)
+            clean_response = self.extract_response_text(result, prompt_for_api).strip()
+            if isinstance(result, dict) and 'error' in result:
+                cache_key = None
+            return self._end_turn(clean_response, cache_key)
+
+        except (aiohttp.ClientError, asyncio.TimeoutError, requests.exceptions.RequestException) as e:
+            error_message = f"Network issue connecting to model API: {str(e) or type(e).__name__}. Please try again later."
+            print(error_message)
+            metrics.inc("jobsevak_errors_total", kind="network")
+            return self._end_turn(error_message)
+        except Exception as e:
+            error_message = f"Unexpected error during API call: {str(e)}."
+            print(error_message)
+            metrics.inc("jobsevak_errors_total", kind="unexpected")
+            return self._end_turn(error_message)
+
+    @profiled
+    @metrics.timed("turn")
+    def chat_stream(self, user_message):
+        """
+        Like chat(), but returns a generator yielding the reply piece by piece as the
+        model streams tokens, with the "JobSevak:"/"User:" cleanup applied on the fly.
+        """
+        if self.missing_token():
+            yield MISSING_TOKEN_MESSAGE
+            return
+
+        snapshot, cache_key, cached = self._begin_turn(user_message)
+        if cached is not None:
+            yield self._end_turn(cached)
+            return
+
+        prompt_for_api = self.get_system_prompt_and_context(user_message, snapshot)
+        payload = self.build_payload(prompt_for_api)
+        pieces = []
+        cleaner = StreamingResponseCleaner()
+
+        try:
+            upstream_start = time.perf_counter()
+            tokens = self.backend.stream(payload, api_token=self.hf_api_token)
+            try:
+                for token in tokens:
+                    if upstream_start is not None:
+                        metrics.observe("jobsevak_stage_seconds", time.perf_counter() - upstream_start,
+                                        stage="upstream_first_token")
+                        upstream_start = None
+                    if not isinstance(token, str):
+                        # The backend answered with a single result; clean it the usual way
+                        if isinstance(token, dict) and 'error' in token:
+                            cache_key = None
+                        piece = self.extract_response_text(token, prompt_for_api).strip()
+                        if piece:
+                            pieces.append(piece)
+                            yield piece
+                        break
+                    piece = cleaner.feed(token)
+                    if piece:
+                        pieces.append(piece)
+                        yield piece
+                    if cleaner.done:
+                        break
+                piece = cleaner.flush()
+                if piece:
+                    pieces.append(piece)
+                    yield piece
+            finally:
+                tokens.close()
+            self._end_turn("".join(pieces).strip(), cache_key)
+
+        except requests.exceptions.RequestException as e:
+            error_message = f"Network issue connecting to model API: {str(e)}. Please try again later."
+            print(error_message)
+            metrics.inc("jobsevak_errors_total", kind="network")
+            yield self._end_turn(error_message)
+        except Exception as e:
+            error_message = f"Unexpected error during API call: {str(e)}."
+            print(error_message)
+            metrics.inc("jobsevak_errors_total", kind="unexpected")
+            yield self._end_turn(error_message)
+
+    def missing_token(self):
+        """
+        True when the backend needs the Hugging Face API token and none was given.
+        """
+        return self.backend.requires_token and not self.hf_api_token
+
+    def _begin_turn(self, user_message):
+        """
+        Record the user's message and look it up in the response cache.
+        Returns (snapshot, cache_key, cached reply or None): the data snapshot the whole turn
+        uses, and cache_key, which is None when the turn can't be cached.
+        """
+        snapshot = self.data.snapshot
+        cache_key = self.get_cache_key(user_message, snapshot)
+        cached = self.response_cache.get(cache_key) if cache_key else None
+        if cache_key:
+            metrics.inc("jobsevak_response_cache_total", result="hit" if cached is not None else "miss")
+
+        self.history.add("user", user_message)
+        return snapshot, cache_key, cached
+
+    def _end_turn(self, response, cache_key=None):
+        """
+        Record the assistant's reply (caching it under cache_key if given) and return it.
+        """
+        if cache_key and response:
+            self.response_cache.set(cache_key, response)
+        metrics.observe("jobsevak_response_tokens", self.prompt_builder.counter.count(response), SIZE_BUCKETS)
+        metrics.observe("jobsevak_response_bytes", len(response.encode("utf-8")), SIZE_BUCKETS)
+        self.history.add("assistant", response)
+        return response
+
+    def get_cache_key(self, user_message, snapshot=None):
+        """
+        Response-cache key for a message, or None when earlier turns would be part of the
+        prompt (the reply then depends on the conversation, not just the query).
+        """
+        if len(self.history):
+            return None
+        snapshot = snapshot or self.data.snapshot
+        intent = snapshot.intent_extractor.extract(user_message)
+        return make_cache_key(user_message, intent, snapshot.version)
+
+    def build_payload(self, prompt, stream=False):
+        """
+        Request body for the text-generation endpoint.
+        """
+        payload = {
+            "inputs": prompt,
+            "parameters": {
+                "max_new_tokens": 150,
+                "num_return_sequences": 1,
+                "temperature": 0.7,
+                "top_p": 0.95,
+                "do_sample": True,
+                "no_repeat_ngram_size": 2,
+                "early_stopping": True
+            },
+            "options": {
+                "wait_for_model": True # If the model is not ready, wait for it to load
+            }
+        }
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    @metrics.timed("response_cleanup")
+    def extract_response_text(self, result, prompt_for_api):
+        """
+        Pull the assistant's reply out of a (non-streaming) API result, dropping an echoed
+        prompt and any simulated "JobSevak:"/"User:" conversation (see clean_reply()).
+        """
+        response_text = ""
+
+        if isinstance(result, list) and result:
+            response_text = result[0].get('generated_text', '')
+
+            # If the model included prompt in response, remove it
+            if response_text.startswith(prompt_for_api):
+                response_text = response_text[len(prompt_for_api):].strip()
+
+            # Keep only the assistant's reply, cut the same way as streamed replies
+            response_text = clean_reply(response_text)
+
+        elif isinstance(result, dict) and 'generated_text' in result:
+            response_text = clean_reply(result.get('generated_text', ''))
+
+        elif isinstance(result, dict) and 'error' in result:
+            response_text = f"Model API Error: {result['error']}"
+            if 'estimated_time' in result:
+                response_text += f" The model might be loading, estimated time: {result['estimated_time']:.2f}s."
+        else:
+            response_text = "Sorry, I received an unexpected response from the model service."
+            print(f"Unexpected API response format: {result}")
+
+        return response_text
@@ -0,0 +1,281 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+
+from job_index import JobIndex
+from intent import IntentExtractor
+from faq_retriever import FAQRetriever
+from job_ingest import ingest_jobs
+from metrics import get_metrics
+
+# Determine the base directory for data files consistently
+# This assumes data_store.py is in the 'app' directory, and 'data' is a subdirectory of 'app'.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__)) # app directory
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+DATA_FILES = ('faqs.json', 'mock_jobs.json', 'mock_jobs.jsonl', 'cities.json')
+# Job feeds in order of preference; a JSONL feed (one job per line) wins when present
+JOB_FILES = ('mock_jobs.jsonl', 'mock_jobs.json')
+
+# How often the process-wide store checks the data files for changes (0 disables watching)
+POLL_SECONDS = float(os.getenv("JOBSEVAK_DATA_POLL_SECONDS", "2.0"))
+
+# Fixed instructions at the top of every prompt
+SYSTEM_INSTRUCTIONS = """You are JobSevak, a helpful job assistant for Lokal's Jobs platform in India.
+Your task is to respond to the user's query in a helpful, concise manner.
+IMPORTANT: Only generate ONE RESPONSE as JobSevak. Do not create a simulated conversation.
+DO NOT generate any text that appears to be from the user. Only respond as the assistant.
+
+"""
+
+def data_files_signature(data_dir=DATA_DIR):
+    """
+    Return (name, mtime, size) for each data file; changes whenever a data file is edited.
+    """
+    signature = []
+    for name in DATA_FILES:
+        try:
+            stat = os.stat(os.path.join(data_dir, name))
+            signature.append((name, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((name, None, None))
+    return tuple(signature)
+
+def data_files_version(data_dir=DATA_DIR):
+    """
+    Return a short hash of the data files' contents, used to key cached replies.
+    """
+    digest = hashlib.sha256()
+    for name in DATA_FILES:
+        try:
+            with open(os.path.join(data_dir, name), 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        except OSError:
+            digest.update(b'missing')
+    return digest.hexdigest()[:16]
+
+def jobs_file(data_dir=DATA_DIR):
+    """
+    Path of the job feed to load: mock_jobs.jsonl if it exists, else mock_jobs.json.
+    """
+    for name in JOB_FILES:
+        path = os.path.join(data_dir, name)
+        if os.path.exists(path):
+            return path
+    return os.path.join(data_dir, JOB_FILES[-1])
+
+
+class DataSnapshot:
+    """
+    One loaded copy of the FAQs, jobs and cities plus everything derived from them
+    (job index, intent extractor, FAQ retriever, static prompt prefix).
+
+    Built once and then only read, so a single snapshot can be shared by every chat
+    session and thread in the process. Jobs are held only in the job index; pass
+    `job_index` to use one that was filled while streaming the feed.
+    """
+
+    def __init__(self, faqs, jobs, cities, signature=None, version=None, generation=0, job_index=None):
+        self.faqs = faqs
+        self.cities = cities
+        self.signature = signature
+        self.version = version
+        self.generation = generation
+        self.job_index = job_index if job_index is not None else JobIndex(jobs)
+        self.intent_extractor = IntentExtractor(cities)
+        self.faq_retriever = FAQRetriever(faqs)
+        # The city list is a separate, droppable prompt section (it can be thousands of tokens)
+        self.static_prompt_prefix = SYSTEM_INSTRUCTIONS
+
+    @property
+    def jobs(self):
+        """
+        All jobs as a list, in feed order (built on demand from the index).
+        """
+        return self.job_index.all()
+
+
+class DataLoadError(Exception):
+    """
+    Raised by load_snapshot(strict=True) when a data file is missing or malformed.
+    """
+
+
+def _read_list(data_dir, name, key):
+    with open(os.path.join(data_dir, name), 'r', encoding='utf-8') as f:
+        items = json.load(f)[key]
+    if not isinstance(items, list):
+        raise ValueError(f"'{key}' in {name} is not a list")
+    return items
+
+
+@get_metrics().timed("data_load")
+def load_snapshot(data_dir=DATA_DIR, strict=False, generation=0):
+    """
+    Load FAQs, mock jobs, and cities data from JSON files into a DataSnapshot.
+    With strict=True a missing or malformed file raises DataLoadError; otherwise the
+    error is printed and an empty snapshot is returned.
+    """
+    # Take the signature before reading, so a write racing with the read is seen as a new change
+    signature = data_files_signature(data_dir)
+    try:
+        version = data_files_version(data_dir)
+        faqs = _read_list(data_dir, 'faqs.json', 'faqs')
+        cities = _read_list(data_dir, 'cities.json', 'cities')
+        # Jobs are streamed record by record into the index instead of json.load-ing the whole feed
+        job_index = JobIndex()
+        loaded, skipped = ingest_jobs(jobs_file(data_dir), job_index)
+        if skipped:
+            get_metrics().inc("jobsevak_jobs_skipped_total", skipped)
+            print(f"Skipped {skipped} invalid job records (loaded {loaded}).")
+    except FileNotFoundError as e:
+        if strict:
+            raise DataLoadError(f"Error loading data file: {e}") from e
+        print(f"Error loading data file: {e}. Ensure data files are in {data_dir}")
+        faqs, cities, job_index = [], [], JobIndex()
+    except Exception as e:
+        if strict:
+            raise DataLoadError(f"Could not parse data files in {data_dir}: {e}") from e
+        print(f"An unexpected error occurred loading data: {e}")
+        faqs, cities, job_index = [], [], JobIndex()
+    return DataSnapshot(faqs, None, cities, signature, version, generation, job_index=job_index)
+
+
+class DataStore:
+    """
+    Holds the current DataSnapshot for the process.
+
+    Readers take `store.snapshot` and use it without locking. Reloads parse the files and
+    build all indexes into a new snapshot first, then swap the reference, so in-flight
+    chats keep the snapshot they started with. If the new files fail to parse, the last
+    good snapshot stays in place. `generation` goes up by one on every swap, for caches
+    that need to notice new data.
+
+    start_watching() polls the files' mtimes on a background thread and reloads there,
+    off the request path. A store created from an explicit snapshot has no data_dir and
+    never reloads.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, snapshot=None):
+        self.data_dir = data_dir if snapshot is None else None
+        self._lock = threading.Lock()
+        self._snapshot = snapshot if snapshot is not None else load_snapshot(data_dir)
+        # Signature of the last files we tried to load, good or bad, so a broken file isn't re-parsed every poll
+        self._attempted_signature = self._snapshot.signature
+        self._watcher = None
+        self._stop_watching = threading.Event()
+        self._edits = 0  # add_job()/remove_job() calls since the files were last loaded
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    @property
+    def generation(self):
+        return self._snapshot.generation
+
+    def reload(self):
+        """
+        Re-read the data files and swap in the new snapshot.
+        Keeps (and returns) the current snapshot if the files can't be loaded.
+        """
+        if self.data_dir is None:
+            return self._snapshot
+        try:
+            snapshot = load_snapshot(self.data_dir, strict=True)
+        except DataLoadError as e:
+            self._attempted_signature = data_files_signature(self.data_dir)
+            print(f"{e}. Keeping the previously loaded data.")
+            return self._snapshot
+        with self._lock:
+            if self._edits:
+                print(f"Reloaded data files; {self._edits} job edits not saved to them were dropped.")
+                self._edits = 0
+            snapshot.generation = self._snapshot.generation + 1
+            self._snapshot = snapshot
+            self._attempted_signature = snapshot.signature
+        return snapshot
+
+    def reload_if_changed(self):
+        """
+        Reload when a data file's mtime or size changed since the last load attempt.
+        """
+        if self.data_dir is not None and self._attempted_signature != data_files_signature(self.data_dir):
+            return self.reload()
+        return self._snapshot
+
+    def start_watching(self, interval=POLL_SECONDS):
+        """
+        Start a daemon thread that calls reload_if_changed() every `interval` seconds.
+        """
+        if self.data_dir is None or interval <= 0 or self._watcher is not None:
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name="data-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._stop_watching.set()
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self, interval):
+        while not self._stop_watching.wait(interval):
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                print(f"Data watcher error: {e}")
+
+    def add_job(self, job):
+        """
+        Add or replace a job listing. Like a reload, this swaps in a new snapshot (with an
+        edited copy of the job index, see JobIndex.copy()), so readers never see a
+        half-updated index, and the new generation/version keeps cached replies from being
+        reused. Edits not also written to the data files are lost on the next reload.
+        """
+        with self._lock:
+            snapshot = self._edited_snapshot()
+            snapshot.job_index.add(job)
+            self._snapshot = snapshot
+
+    def remove_job(self, job_id):
+        """
+        Remove a job listing by id (copy-on-write, like add_job()). Returns False if the id is unknown.
+        """
+        with self._lock:
+            if job_id not in self._snapshot.job_index:
+                return False
+            snapshot = self._edited_snapshot()
+            snapshot.job_index.remove(job_id)
+            self._snapshot = snapshot
+            return True
+
+    def _edited_snapshot(self):
+        # Shallow copy sharing everything but the job index; call with the lock held
+        snapshot = copy.copy(self._snapshot)
+        snapshot.job_index = self._snapshot.job_index.copy()
+        snapshot.generation += 1
+        snapshot.version = f"{self._snapshot.version}+{snapshot.generation}"
+        self._edits += 1
+        return snapshot
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_data_store():
+    """
+    Return the process-wide DataStore, loading the data files on first use and
+    watching them for changes.
+    """
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = DataStore()
+            _shared_store.start_watching()
+        return _shared_store
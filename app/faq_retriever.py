@@ -0,0 +1,79 @@
+import re
+from collections import Counter
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Common words that carry no signal for matching a query to an FAQ
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from how i if in is it me my of on or so
+the to what when where which who why will with you your
+""".split())
+
+
+def tokenize(text):
+    """
+    Lowercase word tokens with stopwords removed.
+    """
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+class FAQRetriever:
+    """
+    Offline BM25 index over the FAQ list.
+
+    Each term keeps a postings array of FAQ ids and a matching array of precomputed BM25
+    weights, so scoring a query is one NumPy scatter-add per query term.
+    """
+
+    def __init__(self, faqs, k1=1.5, b=0.75):
+        self.faqs = faqs
+        self._postings = {}  # term -> (faq ids, weights)
+
+        docs = [Counter(tokenize(f"{faq['question']} {faq['answer']}")) for faq in faqs]
+        if not docs:
+            return
+        lengths = np.array([sum(doc.values()) for doc in docs], dtype=np.float32)
+        avg_length = max(float(lengths.mean()), 1.0)
+        norms = k1 * (1 - b + b * lengths / avg_length)
+
+        term_docs, term_tfs = {}, {}
+        for doc_id, doc in enumerate(docs):
+            for term, tf in doc.items():
+                term_docs.setdefault(term, []).append(doc_id)
+                term_tfs.setdefault(term, []).append(tf)
+
+        count = len(docs)
+        for term, ids in term_docs.items():
+            ids = np.array(ids, dtype=np.int32)
+            tfs = np.array(term_tfs[term], dtype=np.float32)
+            idf = np.log(1 + (count - len(ids) + 0.5) / (len(ids) + 0.5))
+            weights = idf * tfs * (k1 + 1) / (tfs + norms[ids])
+            self._postings[term] = (ids, weights.astype(np.float32))
+
+    def scores(self, query):
+        """
+        Return the BM25 score of every FAQ for the query.
+        """
+        scores = np.zeros(len(self.faqs), dtype=np.float32)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                ids, weights = postings
+                scores[ids] += weights
+        return scores
+
+    def search(self, query, top_k=3, min_score=0.0):
+        """
+        Return up to top_k FAQs scoring above min_score, best match first.
+        """
+        if not self.faqs or top_k <= 0:
+            return []
+        scores = self.scores(query)
+        if top_k < len(scores):
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(len(scores))
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [self.faqs[i] for i in candidates if scores[i] > min_score]
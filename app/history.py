@@ -0,0 +1,125 @@
+from collections import deque
+
+# Messages kept per session (what the UI can page through)
+HISTORY_CAPACITY = 50
+# Most recent messages sent to the model verbatim; older ones are folded into the summary
+HISTORY_WINDOW = 4
+# Earlier user questions quoted in the summary, and how much of each
+SUMMARY_TOPICS = 5
+SUMMARY_TOPIC_CHARS = 80
+
+
+class RunningSummary:
+    """
+    Constant-size summary of the messages that have left the prompt window, updated one
+    message at a time (no model call): the latest few user questions plus the job search
+    preferences they expressed, with later preferences overriding earlier ones.
+
+    `extract` maps a user message to a QueryIntent; without it only the questions are kept.
+    """
+
+    def __init__(self, extract=None, topics=SUMMARY_TOPICS):
+        self.extract = extract
+        self.count = 0
+        self.topics = deque(maxlen=topics)
+        self.preferences = {}
+
+    def update(self, message):
+        self.count += 1
+        if message["role"] != "user":
+            return
+        text = " ".join(message["content"].split())
+        if len(text) > SUMMARY_TOPIC_CHARS:
+            text = text[:SUMMARY_TOPIC_CHARS - 3].rstrip() + "..."
+        self.topics.append(text)
+        if self.extract is None:
+            return
+        intent = self.extract(message["content"])
+        for name, value in (("location", intent.location), ("job type", intent.job_type),
+                            ("gender", intent.gender), ("minimum salary", intent.min_salary),
+                            ("maximum salary", intent.max_salary)):
+            if value is not None:
+                self.preferences[name] = f"₹{value:,.0f}" if isinstance(value, float) else value
+
+    def text(self):
+        if not self.count:
+            return ""
+        parts = [f"{self.count} earlier messages."]
+        if self.topics:
+            parts.append("The user asked: " + "; ".join(f'"{topic}"' for topic in self.topics) + ".")
+        if self.preferences:
+            parts.append("Preferences mentioned: " +
+                         ", ".join(f"{name} {value}" for name, value in self.preferences.items()) + ".")
+        return " ".join(parts)
+
+
+class ConversationHistory:
+    """
+    One session's conversation, shared by JobChatBot and the Streamlit UI.
+
+    Messages ({"role", "content"} dicts) go into a ring buffer of `capacity` entries, so
+    memory stays bounded however long the session runs. The last `window` messages are
+    what the prompt quotes; each message that moves out of that window is folded into
+    `summary`, so older context survives in a fixed amount of prompt space.
+    """
+
+    def __init__(self, capacity=HISTORY_CAPACITY, window=HISTORY_WINDOW, summary=None):
+        if capacity < window + 1:
+            raise ValueError("capacity must be larger than window")
+        self.window = window
+        self.summary = summary or RunningSummary()
+        self._messages = deque(maxlen=capacity)
+        self.total = 0  # messages ever added
+
+    def __len__(self):
+        return len(self._messages)
+
+    def __iter__(self):
+        return iter(self._messages)
+
+    def add(self, role, content):
+        self._messages.append({"role": role, "content": content})
+        self.total += 1
+        if len(self._messages) > self.window:
+            self.summary.update(self._messages[-self.window - 1])
+
+    def recent(self, count=None):
+        """
+        The last `count` messages (default: the prompt window), oldest first.
+        """
+        count = self.window if count is None else count
+        start = max(len(self._messages) - count, 0)
+        return [self._messages[i] for i in range(start, len(self._messages))]
+
+    @property
+    def evicted(self):
+        """
+        Messages dropped from the ring buffer (no longer available to page through).
+        """
+        return self.total - len(self._messages)
+
+    def state(self):
+        """
+        JSON-serializable copy of the history and its summary, for restore().
+        """
+        summary = self.summary
+        return {"messages": list(self._messages), "total": self.total,
+                "summary": {"count": summary.count, "topics": list(summary.topics),
+                            "preferences": summary.preferences}}
+
+    def restore(self, state):
+        """
+        Replace the contents with a state() taken earlier, possibly in another process.
+        """
+        self._messages.clear()
+        self._messages.extend(state["messages"])
+        self.total = state["total"]
+        self.summary.count = state["summary"]["count"]
+        self.summary.topics.clear()
+        self.summary.topics.extend(state["summary"]["topics"])
+        self.summary.preferences = dict(state["summary"]["preferences"])
+
+    def clear(self):
+        self._messages.clear()
+        self.total = 0
+        self.summary = RunningSummary(self.summary.extract, self.summary.topics.maxlen)
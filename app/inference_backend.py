@@ -0,0 +1,262 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+import requests
+
+from inference_client import get_inference_client
+from async_client import get_async_inference_client
+from streaming import iter_sse_tokens
+
+MODEL_API_URL = os.getenv("MODEL_API_URL", "https://api-inference.huggingface.co/models/meta-llama/Llama-3.1-8B-Instruct")
+
+# "remote" calls MODEL_API_URL; "local" runs JOBSEVAK_LOCAL_MODEL in this process
+BACKEND = os.getenv("JOBSEVAK_BACKEND", "remote")
+# Directory holding a small seq2seq or causal model saved with save_pretrained()
+LOCAL_MODEL_PATH = os.getenv("JOBSEVAK_LOCAL_MODEL", "")
+# Dynamic batching: prompts per generate() call, and how long the worker waits for a batch to fill
+MAX_BATCH_SIZE = 8
+MAX_BATCH_WAIT = 0.01
+# How long a caller waits for the local model (first call includes loading it)
+LOCAL_TIMEOUT = 120.0
+
+# Text-generation parameters the local backend passes on to model.generate()
+_GENERATE_PARAMETERS = ('max_new_tokens', 'temperature', 'top_p', 'do_sample', 'no_repeat_ngram_size')
+
+
+class InferenceBackend:
+    """
+    Where JobChatBot sends its prompts.
+
+    Every backend takes a text-generation payload ({"inputs": prompt, "parameters": {...}})
+    and returns a result shaped like the Hugging Face Inference API's, so the bot's reply
+    extraction works the same for all of them.
+    """
+
+    # Whether calls need the Hugging Face API token
+    requires_token = False
+
+    def generate(self, payload, api_token=None):
+        raise NotImplementedError
+
+    async def agenerate(self, payload, api_token=None, deadline=None):
+        raise NotImplementedError
+
+    def stream(self, payload, api_token=None):
+        """
+        Yield the reply as text tokens, or yield a single non-streaming result
+        (list/dict) when the reply doesn't come token by token.
+        """
+        yield self.generate(payload, api_token)
+
+
+class RemoteBackend(InferenceBackend):
+    """
+    The Hugging Face Inference API (or any compatible endpoint) over HTTP, through the
+    shared pooled/retrying clients. `url` defaults to MODEL_API_URL at call time.
+    """
+
+    requires_token = True
+
+    def __init__(self, url=None, client=None):
+        self.url = url
+        self.client = client or get_inference_client()
+
+    @property
+    def endpoint(self):
+        return self.url or MODEL_API_URL
+
+    def generate(self, payload, api_token=None):
+        response = self.client.post(self.endpoint, api_token=api_token, json=payload)
+        response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
+        return response.json()
+
+    async def agenerate(self, payload, api_token=None, deadline=None):
+        client = get_async_inference_client()
+        status, result = await client.post_json(self.endpoint, payload, api_token=api_token, deadline=deadline)
+        if status >= 400:
+            raise requests.exceptions.HTTPError(f"{status} Error for url: {self.endpoint}")
+        return result
+
+    def stream(self, payload, api_token=None):
+        response = self.client.post(self.endpoint, api_token=api_token, json={**payload, "stream": True}, stream=True)
+        try:
+            response.raise_for_status()
+            if 'text/event-stream' in response.headers.get('Content-Type', ''):
+                yield from iter_sse_tokens(response)
+            else:
+                # The endpoint answered with a single JSON body
+                yield response.json()
+        finally:
+            response.close()
+
+
+class LocalModelError(RuntimeError):
+    """
+    Raised when the local model can't be loaded or run.
+    """
+
+
+class LocalBackend(InferenceBackend):
+    """
+    Runs a small seq2seq or causal language model on the CPU in this process.
+
+    The model is loaded from `model_path` (no network) on first use. Requests are queued
+    to one background worker thread, which collects whatever arrives within
+    `max_batch_wait` seconds (up to `max_batch_size` prompts) and runs them as one padded
+    generate() call, so concurrent users share the forward passes. Replies contain only
+    the generated text, never the prompt.
+    """
+
+    def __init__(self, model_path=LOCAL_MODEL_PATH, max_batch_size=MAX_BATCH_SIZE,
+                 max_batch_wait=MAX_BATCH_WAIT, timeout=LOCAL_TIMEOUT):
+        self.model_path = model_path
+        self.max_batch_size = max_batch_size
+        self.max_batch_wait = max_batch_wait
+        self.timeout = timeout
+        self._requests = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._model = None
+        self._tokenizer = None
+        self._seq2seq = False
+        self.batches = 0
+        self.batched_requests = 0
+
+    def submit(self, payload):
+        """
+        Queue a payload and return a concurrent.futures.Future for its result.
+        """
+        self._ensure_worker()
+        future = Future()
+        parameters = payload.get("parameters") or {}
+        options = tuple((name, parameters[name]) for name in _GENERATE_PARAMETERS if name in parameters)
+        self._requests.put((payload["inputs"], options, future))
+        return future
+
+    def generate(self, payload, api_token=None):
+        return self.submit(payload).result(self.timeout)
+
+    async def agenerate(self, payload, api_token=None, deadline=None):
+        return await asyncio.wait_for(asyncio.wrap_future(self.submit(payload)), deadline or self.timeout)
+
+    def _ensure_worker(self):
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="local-model", daemon=True)
+                self._worker.start()
+
+    def _load(self):
+        if not self.model_path or not os.path.isdir(self.model_path):
+            raise LocalModelError(f"Local model directory not found: {self.model_path!r}. Set JOBSEVAK_LOCAL_MODEL")
+        try:
+            import torch
+            from transformers import AutoConfig, AutoModelForCausalLM, AutoModelForSeq2SeqLM, AutoTokenizer
+        except ImportError as e:
+            raise LocalModelError(f"The local backend needs torch and transformers: {e}") from e
+
+        config = AutoConfig.from_pretrained(self.model_path, local_files_only=True)
+        self._seq2seq = bool(config.is_encoder_decoder)
+        model_class = AutoModelForSeq2SeqLM if self._seq2seq else AutoModelForCausalLM
+        self._model = model_class.from_pretrained(self.model_path, local_files_only=True, torch_dtype=torch.float32)
+        self._model.eval()
+        # Causal models are padded on the left so every prompt ends where generation starts
+        self._tokenizer = AutoTokenizer.from_pretrained(
+            self.model_path, local_files_only=True, padding_side="right" if self._seq2seq else "left")
+        if self._tokenizer.pad_token is None:
+            self._tokenizer.pad_token = self._tokenizer.eos_token
+
+    def _run(self):
+        try:
+            self._load()
+        except Exception as e:
+            error = e if isinstance(e, LocalModelError) else LocalModelError(f"Could not load local model: {e}")
+            print(error)
+            # Fail every request from now on instead of leaving callers waiting
+            while True:
+                _, _, future = self._requests.get()
+                if future.set_running_or_notify_cancel():
+                    _resolve(future, error=error)
+
+        while True:
+            batch = [self._requests.get()]
+            deadline = time.monotonic() + self.max_batch_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait())
+                except queue.Empty:
+                    break
+            # Skip callers that gave up (an achat deadline cancels the future) while queued;
+            # the rest can no longer be cancelled
+            batch = [request for request in batch if request[2].set_running_or_notify_cancel()]
+
+            # One generate() call per distinct set of generation parameters
+            groups = {}
+            for request in batch:
+                groups.setdefault(request[1], []).append(request)
+            for options, requests_ in groups.items():
+                self._generate_batch(requests_, dict(options))
+
+    def _generate_batch(self, batch, options):
+        import torch
+
+        prompts = [prompt for prompt, _, _ in batch]
+        try:
+            inputs = self._tokenizer(prompts, return_tensors="pt", padding=True, truncation=True)
+            if not options.get("do_sample"):
+                options.pop("temperature", None)
+                options.pop("top_p", None)
+            with torch.inference_mode():
+                output = self._model.generate(**inputs, **options, pad_token_id=self._tokenizer.pad_token_id)
+            if not self._seq2seq:
+                output = output[:, inputs["input_ids"].shape[1]:]
+            texts = self._tokenizer.batch_decode(output, skip_special_tokens=True)
+        except Exception as e:
+            for _, _, future in batch:
+                _resolve(future, error=LocalModelError(f"Local generation failed: {e}"))
+            return
+        self.batches += 1
+        self.batched_requests += len(batch)
+        for (_, _, future), text in zip(batch, texts):
+            _resolve(future, [{"generated_text": text}])
+
+
+def _resolve(future, result=None, error=None):
+    """
+    Complete a request's future, ignoring one that is already done so a single caller
+    can't take down the worker thread (and every request queued behind it).
+    """
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name=None):
+    """
+    Return the process-wide backend called `name` ("remote" or "local", default
+    JOBSEVAK_BACKEND). The local model is shared by every session in the process.
+    """
+    name = name or BACKEND
+    with _backends_lock:
+        backend = _backends.get(name)
+        if backend is None:
+            if name == "remote":
+                backend = RemoteBackend()
+            elif name == "local":
+                backend = LocalBackend()
+            else:
+                raise ValueError(f"Unknown inference backend {name!r}; expected 'remote' or 'local'.")
+            _backends[name] = backend
+        return backend
@@ -0,0 +1,217 @@
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import get_metrics
+
+# Connection pool size per host; Streamlit serves many sessions from one process
+POOL_SIZE = 10
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 20.0
+# Never sleep longer than this for a single retry, whatever estimated_time says
+MAX_RETRY_WAIT = 30.0
+
+BREAKER_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30.0
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """
+    Raised instead of calling the API while the circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing service for a while after repeated failures.
+
+    After `threshold` consecutive failures the breaker opens and rejects calls for
+    `reset_seconds`; then one trial call is let through (half-open) and its result
+    either closes the breaker again or re-opens it.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS, clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """
+        Return True if a call may go through now.
+        """
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.threshold:
+                self._opened_at = self._clock()
+            self._trial_in_flight = False
+
+
+class CircuitBreakers:
+    """
+    One CircuitBreaker per URL, created on first use, so a failing endpoint (say Whisper
+    stuck loading) doesn't stop calls to another (the chat model).
+    """
+
+    def __init__(self, factory=CircuitBreaker):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+    def get(self, url):
+        with self._lock:
+            breaker = self._breakers.get(url)
+            if breaker is None:
+                breaker = self._breakers[url] = self._factory()
+            return breaker
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, maximum=BACKOFF_MAX, estimated_time=None):
+    """
+    Seconds to wait before retry number `attempt` (0-based): full-jitter exponential
+    backoff, but never less than the server's estimated_time.
+    """
+    delay = random.uniform(0, min(maximum, base * (2 ** attempt)))
+    if estimated_time:
+        delay = max(delay, float(estimated_time))
+    return min(delay, MAX_RETRY_WAIT)
+
+
+def _is_model_loading(response):
+    """
+    Return (loading, estimated_time) for a Hugging Face "model is loading" reply.
+    """
+    if response.status_code != 503:
+        return False, None
+    try:
+        body = response.json()
+    except ValueError:
+        return True, None
+    if isinstance(body, dict):
+        return True, body.get('estimated_time')
+    return True, None
+
+
+class InferenceClient:
+    """
+    Shared HTTP client for the Hugging Face Inference API.
+
+    Keeps one pooled keep-alive `requests.Session`, uses separate connect/read timeouts,
+    retries 503 / "model loading" replies and connection errors with jittered exponential
+    backoff (waiting at least the server's `estimated_time`), and trips a circuit breaker
+    for a URL when it keeps failing (each URL has its own breaker).
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX,
+                 breakers=None, session=None, sleep=time.sleep):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breakers = breakers or CircuitBreakers()
+        self._sleep = sleep
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def backoff(self, attempt, estimated_time=None):
+        return backoff_delay(attempt, self.backoff_base, self.backoff_max, estimated_time)
+
+    def post(self, url, api_token=None, **kwargs):
+        """
+        POST to the inference API with retries. Returns the final `requests.Response`
+        (which may still be an error status) or raises a `requests` exception.
+        """
+        headers = dict(kwargs.pop('headers', None) or {})
+        if api_token:
+            headers["Authorization"] = f"Bearer {api_token}"
+        kwargs.setdefault('timeout', self.timeout)
+
+        breaker = self.breakers.get(url)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit breaker open for {url}; not calling the model API.")
+
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(url, headers=headers, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    breaker.record_failure()
+                    raise
+                get_metrics().inc("jobsevak_upstream_retries_total", client="sync", reason="connection")
+                self._sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            except requests.exceptions.RequestException:
+                breaker.record_failure()
+                raise
+
+            loading, estimated_time = _is_model_loading(response)
+            if loading and attempt < self.max_retries:
+                response.close()
+                get_metrics().inc("jobsevak_upstream_retries_total", client="sync", reason="loading")
+                self._sleep(self.backoff(attempt, estimated_time))
+                attempt += 1
+                continue
+
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            return response
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_inference_client():
+    """
+    Return the process-wide InferenceClient, creating it on first use.
+    """
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = InferenceClient()
+        return _shared_client
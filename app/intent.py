@@ -0,0 +1,210 @@
+import re
+from dataclasses import dataclass
+
+from faq_retriever import tokenize
+from job_table import MONTHLY_FACTORS, PERIOD_WORDS, SALARY_PERIODS
+
+# Words that mark a query as being about jobs (matched as whole words)
+JOB_KEYWORDS = [
+    'job', 'jobs', 'work', 'works', 'working', 'worker', 'workers', 'employment',
+    'career', 'careers', 'listing', 'listings', 'opportunity', 'opportunities',
+    'vacancy', 'vacancies',
+]
+
+# Spoken forms -> gender_preference value used in mock_jobs.json
+GENDER_KEYWORDS = {
+    'women': 'Female', 'woman': 'Female', 'female': 'Female', 'females': 'Female', 'ladies': 'Female',
+    'men': 'Male', 'man': 'Male', 'male': 'Male', 'males': 'Male', 'gents': 'Male',
+}
+
+# Spoken forms -> job_type value; spaces also match hyphens ("part-time")
+JOB_TYPE_KEYWORDS = {
+    'part time': 'Part-time', 'parttime': 'Part-time',
+    'full time': 'Full-time', 'fulltime': 'Full-time',
+}
+
+# Recency phrases -> "posted within N days". Only phrases that clearly ask about posting
+# dates: bare "today" or "new" ("what's available today?", "I'm new here") are not filters
+RECENCY_KEYWORDS = {
+    'posted today': 1, 'posted yesterday': 2,
+    'posted this week': 7, 'posted last week': 14, 'posted in the last week': 7, 'posted in the past week': 7,
+    'posted this month': 31, 'posted last month': 62, 'posted in the last month': 31,
+    'posted recently': 14, 'recently posted': 14,
+    'latest jobs': 14, 'newest jobs': 14, 'recent jobs': 14,
+    'latest listings': 14, 'newest listings': 14, 'latest openings': 14, 'latest vacancies': 14,
+}
+
+# Salary phrases: "above 20k", "at least ₹15,000", "under 10000", "between 10k and 20k",
+# optionally with a period ("at least 2 lakh per year", "above 500/day")
+_PERIOD = r'(?:\s*(?:/|(?:per|a|an|every)\s)?\s*(' + '|'.join(PERIOD_WORDS) + r')\b)?'
+_AMOUNT = r'(rs\.?|inr|₹)?\s*(\d[\d,]*(?:\.\d+)?)\s*(k|thousand|lakh|lakhs|lac)?\b' + _PERIOD
+_SALARY_RE = re.compile(
+    r'\b(?:(between)\s+' + _AMOUNT + r'\s+(?:and|to|-)\s+' + _AMOUNT +
+    r'|(above|over|more than|greater than|at least|minimum|min|from|below|under|less than|at most|maximum|max|up to|upto)\s+' + _AMOUNT + ')'
+)
+# Amounts below MIN_SALARY are never salaries (same cut-off as job_table.parse_salary); bare
+# numbers below MIN_BARE_SALARY ("under 25 years", "from 9 to 5") need a currency, k/lakh
+# or a period
+MIN_SALARY = 10
+MIN_BARE_SALARY = 1000
+_MIN_WORDS = {'above', 'over', 'more than', 'greater than', 'at least', 'minimum', 'min', 'from'}
+_MULTIPLIERS = {'k': 1_000, 'thousand': 1_000, 'lakh': 100_000, 'lakhs': 100_000, 'lac': 100_000}
+
+# Query words that say nothing about which job is wanted, left out of the search keywords
+FILLER_WORDS = frozenset("""
+any all show find search get give list looking look need want please available near nearby
+there some salary salaries pay paying posted per month monthly jobs job rs inr
+above over under below less more than least minimum maximum min max upto up between
+good better best great nice decent high higher highest well year years old age
+""".split())
+
+# When a query mentions both, these win (same precedence as the old substring checks)
+PREFERRED_GENDER = 'Female'
+PREFERRED_JOB_TYPE = 'Part-time'
+
+_SEPARATORS = re.compile(r'[\s\-]+')
+
+
+def _normalize(text):
+    return _SEPARATORS.sub(' ', text.strip().lower())
+
+
+def _trie_pattern(words):
+    """
+    Compile a list of words into a trie-shaped regex alternation.
+    Shared prefixes are factored out, so the regex engine does at most one branch per
+    character of the query instead of trying every word at every position.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        end = '' in node
+        branches = []
+        for char in sorted(k for k in node if k):
+            atom = r'[\s\-]+' if char == ' ' else re.escape(char)
+            branches.append(atom + build(node[char]))
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if end:
+            body = '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+def _amount(currency, number, suffix, period):
+    """
+    Monthly rupee value of a matched amount, or None when it can't be a salary. Amounts
+    per hour, day, week or year are converted as job_table's MONTHLY_FACTORS do; amounts
+    without a period are taken as monthly.
+    """
+    value = float(number.replace(',', ''))
+    if suffix:
+        value *= _MULTIPLIERS[suffix]
+    elif not currency and not period and value < MIN_BARE_SALARY:
+        return None
+    if value < MIN_SALARY:
+        return None
+    if period:
+        value *= MONTHLY_FACTORS[SALARY_PERIODS.index(PERIOD_WORDS[period])]
+    return value
+
+
+@dataclass
+class QueryIntent:
+    location: str = None
+    job_type: str = None
+    gender: str = None
+    is_job_query: bool = False
+    min_salary: float = None          # monthly rupees
+    max_salary: float = None
+    posted_within_days: int = None
+    keywords: tuple = ()              # remaining content words, matched against title/description/requirements
+
+
+class IntentExtractor:
+    """
+    Single-pass extractor for the job filters mentioned in a user query.
+
+    All cities and keywords are compiled into one word-bounded regex up front, so a query
+    is lowercased and scanned once no matter how many cities are loaded, and "men" no
+    longer matches inside "women" or "employment".
+    """
+
+    def __init__(self, cities):
+        # Normalized term -> (kind, value); cities keep their original spelling as the value
+        self._terms = {}
+        for word in JOB_KEYWORDS:
+            self._terms[_normalize(word)] = ('job', True)
+        for word, gender in GENDER_KEYWORDS.items():
+            self._terms[_normalize(word)] = ('gender', gender)
+        for word, job_type in JOB_TYPE_KEYWORDS.items():
+            self._terms[_normalize(word)] = ('job_type', job_type)
+        for word, days in RECENCY_KEYWORDS.items():
+            self._terms[_normalize(word)] = ('recency', days)
+        for city in cities:
+            self._terms.setdefault(_normalize(city), ('location', city))
+
+        self._pattern = re.compile(r'\b' + _trie_pattern(self._terms) + r'\b')
+
+    def extract(self, query):
+        """
+        Return the QueryIntent for a query. The first city mentioned wins.
+        """
+        intent = QueryIntent()
+        genders, job_types = set(), set()
+        text = query.lower()
+        # Matched spans are blanked out of `rest`, which is left for keyword extraction
+        rest = list(text)
+        for match in self._pattern.finditer(text):
+            kind, value = self._terms[_normalize(match.group())]
+            if kind == 'job':
+                intent.is_job_query = True
+            elif kind == 'location':
+                if intent.location is None:
+                    intent.location = value
+            elif kind == 'gender':
+                genders.add(value)
+            elif kind == 'recency':
+                # Every recency phrase is about job postings ("latest jobs" also swallows "jobs")
+                intent.is_job_query = True
+                intent.posted_within_days = min(value, intent.posted_within_days or value)
+            else:
+                job_types.add(value)
+            rest[match.start():match.end()] = ' ' * (match.end() - match.start())
+
+        for match in _SALARY_RE.finditer(text):
+            (between, low_currency, low, low_suffix, low_period, high_currency, high, high_suffix, high_period,
+             bound, currency, number, suffix, period) = match.groups()
+            if between:
+                # "between 2 and 3 lakh per year": the unit and period after the range cover both ends
+                amounts = (_amount(low_currency, low, low_suffix or high_suffix, low_period or high_period),
+                           _amount(high_currency, high, high_suffix, high_period))
+                if None in amounts:
+                    continue
+                intent.min_salary, intent.max_salary = sorted(amounts)
+            else:
+                amount = _amount(currency, number, suffix, period)
+                if amount is None:
+                    continue
+                if bound in _MIN_WORDS:
+                    intent.min_salary = amount
+                else:
+                    intent.max_salary = amount
+            rest[match.start():match.end()] = ' ' * (match.end() - match.start())
+
+        intent.keywords = tuple(dict.fromkeys(
+            word for word in tokenize(''.join(rest))
+            if len(word) > 1 and word not in FILLER_WORDS and not word.isdigit()))
+
+        if genders:
+            intent.gender = PREFERRED_GENDER if PREFERRED_GENDER in genders else genders.pop()
+        if job_types:
+            intent.job_type = PREFERRED_JOB_TYPE if PREFERRED_JOB_TYPE in job_types else job_types.pop()
+        return intent
@@ -0,0 +1,370 @@
+import copy
+import datetime
+from array import array
+from collections import defaultdict
+from functools import partial
+
+import numpy as np
+
+from faq_retriever import tokenize
+from job_table import MONTHLY_FACTORS, JobTable, SALARY_PERIODS, UNKNOWN_DAY
+
+# Jobs with this gender preference match every gender filter
+ANY_GENDER = "any"
+
+# Score per query keyword found in each text field
+TITLE_WEIGHT = 3.0
+REQUIREMENT_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+# Extra score for a job posted today, fading as it ages (halved after RECENCY_HALF_LIFE_DAYS)
+RECENCY_WEIGHT = 1.0
+RECENCY_HALF_LIFE_DAYS = 30
+# Extra score for the best-paying candidate, scaled down for the rest
+SALARY_WEIGHT = 0.5
+
+# MONTHLY_FACTORS indexed by salary_period code
+_MONTHLY_FACTORS = np.array(MONTHLY_FACTORS, dtype=np.float32)
+assert len(_MONTHLY_FACTORS) == len(SALARY_PERIODS)
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+def text_terms(text):
+    """
+    Distinct search terms in a piece of text: lowercase tokens without stopwords,
+    with a trailing plural "s" dropped so "drivers" finds "Driver".
+    """
+    return {token[:-1] if len(token) > 3 and token.endswith('s') else token for token in tokenize(text)}
+
+
+def _iter_bits(bitmap, limit=None):
+    """
+    Yield the positions of the set bits of an int bitmap, lowest first.
+    Stops after `limit` positions so top-k callers never walk the whole bitmap.
+    """
+    if limit is not None and limit <= 64:
+        count = 0
+        while bitmap and count < limit:
+            lowest = bitmap & -bitmap
+            yield lowest.bit_length() - 1
+            bitmap ^= lowest
+            count += 1
+        return
+
+    # Full scans go word by word so long runs of zeros are skipped cheaply
+    size = (bitmap.bit_length() + 63) // 64
+    words = memoryview(bitmap.to_bytes(size * 8, 'little')).cast('Q')
+    count = 0
+    for word_index, word in enumerate(words):
+        base = word_index * 64
+        while word:
+            lowest = word & -word
+            yield base + lowest.bit_length() - 1
+            word ^= lowest
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+
+class _Bitset:
+    """
+    Mutable bitset: O(1) set/clear on a bytearray, with the int form used for
+    AND/OR built lazily and cached until the next change.
+    """
+
+    __slots__ = ('_bytes', '_int')
+
+    def __init__(self):
+        self._bytes = bytearray()
+        self._int = 0
+
+    def set(self, pos):
+        byte = pos >> 3
+        if byte >= len(self._bytes):
+            # Grow geometrically so bulk loads stay linear
+            self._bytes.extend(bytes(max(byte + 1 - len(self._bytes), len(self._bytes))))
+        self._bytes[byte] |= 1 << (pos & 7)
+        self._int = None
+
+    def clear(self, pos):
+        byte = pos >> 3
+        if byte < len(self._bytes):
+            self._bytes[byte] &= ~(1 << (pos & 7)) & 0xFF
+            self._int = None
+
+    @property
+    def value(self):
+        if self._int is None:
+            self._int = int.from_bytes(self._bytes, 'little')
+        return self._int
+
+    def __copy__(self):
+        bits = _Bitset()
+        bits._bytes = bytearray(self._bytes)
+        bits._int = self._int
+        return bits
+
+
+class JobIndex:
+    """
+    In-memory index over job listings.
+
+    Every job gets a stable position (its insertion order) and each filterable field
+    (location, job_type, gender_preference) keeps an inverted index from the lowercased
+    value to a bitset of positions. Filters are answered by AND-ing bitmaps, and
+    results come back in insertion order, so they match the order of the source file.
+
+    The jobs themselves live in a columnar JobTable (`table`); result dicts are only
+    built for the rows a query actually returns. Removed jobs keep their row in the
+    table but drop out of every bitset.
+
+    copy() gives an index to edit while readers keep using this one.
+
+    search() adds salary, recency and keyword filters on top and ranks the matches.
+    Keywords are looked up in term -> dictionary-code sets for title and requirements
+    (those columns are dictionary-encoded, so each distinct title is tokenized once) and
+    in term -> position arrays for descriptions.
+    """
+
+    FIELDS = ('location', 'job_type', 'gender_preference')
+
+    def __init__(self, jobs=None):
+        self.table = JobTable()
+        self._positions = {}        # job id -> position
+        self._count = 0
+        self._live = _Bitset()      # positions that hold a job
+        self._by_location = defaultdict(_Bitset)
+        self._by_job_type = defaultdict(_Bitset)
+        self._by_gender = defaultdict(_Bitset)
+        self._title_terms = defaultdict(set)           # term -> title codes
+        self._requirement_terms = defaultdict(set)     # term -> requirement-list codes
+        self._description_terms = defaultdict(partial(array, 'I'))  # term -> positions
+        self._owned = None          # (postings, key) copied since copy(); None: everything is ours
+        for job in jobs or []:
+            self.add(job)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, job_id):
+        return job_id in self._positions
+
+    def copy(self):
+        """
+        A copy of the index to add() to / remove() from while readers keep using this one.
+
+        Rows go into the shared, append-only JobTable storage (see JobTable.copy()) and a
+        posting list is only copied when an edit first touches it, so copy() plus an edit
+        costs about as much as the edit, not the size of the index. Edit only the copy
+        afterwards: the id -> position map is shared as well.
+        """
+        index = copy.copy(self)
+        index.table = self.table.copy()
+        index._live = copy.copy(self._live)
+        index._by_location = defaultdict(_Bitset, self._by_location)
+        index._by_job_type = defaultdict(_Bitset, self._by_job_type)
+        index._by_gender = defaultdict(_Bitset, self._by_gender)
+        index._title_terms = defaultdict(set, self._title_terms)
+        index._requirement_terms = defaultdict(set, self._requirement_terms)
+        index._description_terms = defaultdict(partial(array, 'I'), self._description_terms)
+        index._owned = set()
+        return index
+
+    def _own(self, postings, key):
+        # The posting list to modify, copied first if it may still be shared with the original
+        entry = postings[key]
+        if self._owned is not None and (id(postings), key) not in self._owned:
+            entry = postings[key] = copy.copy(entry)
+            self._owned.add((id(postings), key))
+        return entry
+
+    def _postings(self):
+        return zip((self._by_location, self._by_job_type, self._by_gender), self.FIELDS)
+
+    def add(self, job):
+        """
+        Index a job. A job whose id is already indexed replaces the old entry.
+        """
+        job_id = job.get('id')
+        if job_id is not None and job_id in self._positions:
+            self.remove(job_id)
+
+        pos = self.table.append(job)
+        if job_id is not None:
+            self._positions[job_id] = pos
+        for index, field in self._postings():
+            self._own(index, job.get(field, '').lower()).set(pos)
+        self._index_text(pos, job)
+        self._live.set(pos)
+        self._count += 1
+        return pos
+
+    def _index_text(self, pos, job):
+        table = self.table
+        # A title / requirement list seen for the first time just got the newest code
+        title_code = table.dictionaries['title'].code(job.get('title', ''))
+        if title_code == len(table.dictionaries['title']) - 1:
+            for term in text_terms(job.get('title', '')):
+                self._own(self._title_terms, term).add(title_code)
+        requirements = tuple(job.get('requirements') or ())
+        requirements_code = table.dictionaries['requirements'].code(requirements)
+        if requirements_code == len(table.dictionaries['requirements']) - 1:
+            for term in text_terms(' '.join(requirements)):
+                self._own(self._requirement_terms, term).add(requirements_code)
+        # Removed jobs' positions stay in these arrays; search() masks them out with the live set
+        for term in text_terms(job.get('description', '')):
+            self._own(self._description_terms, term).append(pos)
+
+    def remove(self, job_id):
+        """
+        Drop a job from the index. Returns False if the id is unknown.
+        """
+        pos = self._positions.pop(job_id, None)
+        if pos is None:
+            return False
+        self._live.clear(pos)
+        for index, field in self._postings():
+            self._own(index, self.table.value(pos, field).lower()).clear(pos)
+        self._count -= 1
+        return True
+
+    def update(self, job):
+        """
+        Re-index a job after its fields changed.
+        """
+        return self.add(job)
+
+    def all(self, limit=None):
+        """
+        Return indexed jobs in insertion order.
+        """
+        return [self.table.row(pos) for pos in _iter_bits(self._live.value, limit)]
+
+    def query(self, location=None, job_type=None, gender_preference=None, limit=None):
+        """
+        Return jobs matching every given filter, in insertion order.
+
+        location and gender_preference match exactly (case-insensitive, jobs open to
+        "Any" gender always match); job_type matches as a substring, like "time"
+        matching both "Full-time" and "Part-time". With `limit`, stops after that
+        many results.
+        """
+        bitmap = self._filter(location, job_type, gender_preference)
+        return [self.table.row(pos) for pos in _iter_bits(bitmap, limit)]
+
+    def search(self, location=None, job_type=None, gender_preference=None, min_salary=None,
+               max_salary=None, posted_within_days=None, keywords=(), limit=3, today=None):
+        """
+        Return up to `limit` jobs matching the filters, best first.
+
+        location / job_type / gender_preference filter as in query(). min_salary and
+        max_salary are monthly amounts: a job matches if its (monthly-normalized) range
+        reaches min_salary and starts at or below max_salary; jobs without a parseable
+        salary are left out when either is given. posted_within_days keeps jobs posted
+        at most that many days before `today` (a date, default the current date; pass
+        the feed's date when searching a static feed).
+
+        Keywords are matched against title, requirements and description. If any keyword
+        names a job title in the index, a job's title must match one of those; requirement
+        and description matches only add to the score (everyday words like "good" or
+        "years" turn up in requirements). Jobs are ranked by keyword score, then
+        recency, then salary; ties keep insertion order. Only the top `limit` are sorted
+        (argpartition), not every match.
+        """
+        table = self.table
+        size = len(table)
+        bitmap = self._filter(location, job_type, gender_preference)
+        if not bitmap or not limit:
+            return []
+        mask = np.unpackbits(np.frombuffer(bitmap.to_bytes((size + 7) // 8, 'little'), dtype=np.uint8),
+                             bitorder='little', count=size).view(bool)
+
+        if min_salary is not None or max_salary is not None:
+            factors = _MONTHLY_FACTORS[table.salary_period]
+            if min_salary is not None:
+                mask &= table.salary_max * factors >= min_salary
+            if max_salary is not None:
+                mask &= table.salary_min * factors <= max_salary
+
+        posted_day = table.posted_day
+        known_day = posted_day != UNKNOWN_DAY
+        today_day = ((today or datetime.date.today()) - _EPOCH).days
+        if posted_within_days is not None:
+            mask &= known_day & (posted_day >= today_day - posted_within_days)
+
+        scores, title_hits = self._keyword_scores(keywords, size)
+        if title_hits is not None:
+            mask &= title_hits
+
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return []
+
+        age = np.maximum(today_day - posted_day[candidates], 0).astype(np.float32)
+        recency = np.where(known_day[candidates], RECENCY_WEIGHT / (1 + age / RECENCY_HALF_LIFE_DAYS), 0)
+        monthly = np.nan_to_num(table.salary_max[candidates] * _MONTHLY_FACTORS[table.salary_period[candidates]])
+        best_pay = monthly.max()
+        pay = SALARY_WEIGHT * monthly / best_pay if best_pay > 0 else 0
+        candidate_scores = scores[candidates] + recency + pay
+
+        if len(candidates) > limit:
+            # Everything above the k-th best score, then the earliest of the jobs tied with it
+            kth = candidate_scores[np.argpartition(-candidate_scores, limit - 1)[limit - 1]]
+            above = candidate_scores > kth
+            tied = np.flatnonzero(candidate_scores == kth)[:limit - int(above.sum())]
+            chosen = np.concatenate((np.flatnonzero(above), tied))
+            candidates, candidate_scores = candidates[chosen], candidate_scores[chosen]
+        order = np.lexsort((candidates, -candidate_scores))
+        return [table.row(int(pos)) for pos in candidates[order]]
+
+    def _keyword_scores(self, keywords, size):
+        """
+        (weighted keyword hits per position, title match per position); the second is
+        None when no keyword names a title in the index.
+        """
+        table = self.table
+        scores, title_hits = np.zeros(size, dtype=np.float32), None
+        for term in {term for keyword in keywords for term in text_terms(keyword)}:
+            title_codes = self._title_terms.get(term)
+            if title_codes:
+                hits = self._code_hits(table, 'title', title_codes)
+                scores += TITLE_WEIGHT * hits
+                title_hits = hits if title_hits is None else title_hits | hits
+            requirement_codes = self._requirement_terms.get(term)
+            if requirement_codes:
+                scores += REQUIREMENT_WEIGHT * self._code_hits(table, 'requirements', requirement_codes)
+            positions = self._description_terms.get(term)
+            if positions:
+                scores[np.frombuffer(positions, dtype=np.uint32)] += DESCRIPTION_WEIGHT
+        return scores, title_hits
+
+    @staticmethod
+    def _code_hits(table, name, codes):
+        # Lookup table over the dictionary, gathered by each row's code
+        hit = np.zeros(len(table.dictionaries[name]), dtype=bool)
+        hit[list(codes)] = True
+        return hit[table.codes(name)]
+
+    def _filter(self, location=None, job_type=None, gender_preference=None):
+        bitmap = self._live.value
+        if location:
+            bitmap &= self._bits(self._by_location, location.lower())
+        if job_type and bitmap:
+            needle = job_type.lower()
+            bitmap &= self._union(bits.value for key, bits in list(self._by_job_type.items()) if needle in key)
+        if gender_preference and bitmap:
+            gender = gender_preference.lower()
+            bitmap &= self._bits(self._by_gender, gender) | self._bits(self._by_gender, ANY_GENDER)
+        return bitmap
+
+    @staticmethod
+    def _bits(index, key):
+        bits = index.get(key)
+        return bits.value if bits is not None else 0
+
+    @staticmethod
+    def _union(bitmaps):
+        result = 0
+        for bits in bitmaps:
+            result |= bits
+        return result
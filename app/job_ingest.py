@@ -0,0 +1,145 @@
+import json
+
+# Bytes read from the feed at a time
+CHUNK_SIZE = 1 << 20
+
+REQUIRED_FIELDS = ('id', 'title', 'company', 'location')
+TEXT_FIELDS = ('id', 'title', 'company', 'location', 'salary', 'description', 'job_type',
+               'posted_date', 'gender_preference')
+
+_WHITESPACE = ' \t\r\n'
+
+
+class JobFeedError(ValueError):
+    """
+    Raised when a job feed is not valid JSON / JSONL.
+    """
+
+
+def normalize_job(record):
+    """
+    Validate one raw job record and return a cleaned copy, or None if it is unusable.
+    Text fields are stripped, job_type / gender_preference default to "Any", and
+    requirements is always a list of strings.
+    """
+    if not isinstance(record, dict):
+        return None
+    job = {}
+    get = record.get
+    for field in TEXT_FIELDS:
+        value = get(field)
+        if type(value) is not str:
+            value = '' if value is None else str(value)
+        job[field] = value.strip()
+    for field in REQUIRED_FIELDS:
+        if not job[field]:
+            return None
+    job['job_type'] = job['job_type'] or 'Any'
+    job['gender_preference'] = job['gender_preference'] or 'Any'
+    requirements = get('requirements') or []
+    if isinstance(requirements, str):
+        requirements = [requirements]
+    requirements = [str(item).strip() for item in requirements]
+    job['requirements'] = [item for item in requirements if item]
+    return job
+
+
+def _iter_jsonl(f):
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise JobFeedError(f"line {line_number}: {e}") from e
+
+
+def _iter_json_array(f, key='jobs'):
+    """
+    Yield the elements of the `key` array in a `{"jobs": [...]}` document (or of a
+    top-level array) one at a time, reading the file in chunks.
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(CHUNK_SIZE)
+    eof = not buffer
+
+    # Find the opening bracket of the array
+    start = buffer.lstrip(_WHITESPACE)[:1]
+    if start == '{':
+        marker = f'"{key}"'
+        while True:
+            found = buffer.find(marker)
+            if found >= 0:
+                bracket = buffer.find('[', found + len(marker))
+                if bracket >= 0:
+                    pos = bracket + 1
+                    break
+            if eof:
+                raise JobFeedError(f"no '{key}' array found")
+            more = f.read(CHUNK_SIZE)
+            eof = not more
+            buffer += more
+    elif start == '[':
+        pos = buffer.index('[') + 1
+    else:
+        raise JobFeedError("expected a JSON object or array")
+
+    while True:
+        # Skip separators between elements
+        while True:
+            while pos < len(buffer) and (buffer[pos] in _WHITESPACE or buffer[pos] == ','):
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = f.read(CHUNK_SIZE), 0
+            eof = not buffer
+        if pos >= len(buffer):
+            raise JobFeedError("unexpected end of file inside the jobs array")
+        if buffer[pos] == ']':
+            return
+
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                break
+            except ValueError as e:
+                if eof:
+                    raise JobFeedError(str(e)) from e
+                # The element continues past the buffer; drop what we've consumed and read more
+                more = f.read(CHUNK_SIZE)
+                eof = not more
+                buffer, pos = buffer[pos:] + more, 0
+        yield item
+        pos = end
+        if pos > CHUNK_SIZE:
+            buffer, pos = buffer[pos:], 0
+
+
+def iter_job_records(path):
+    """
+    Stream raw job records from a `.jsonl` file (one job per line) or a
+    `{"jobs": [...]}` JSON document without loading the whole file.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            yield from _iter_jsonl(f)
+        else:
+            yield from _iter_json_array(f)
+
+
+def ingest_jobs(path, index):
+    """
+    Stream, validate and normalize the jobs in `path` straight into `index` (a JobIndex).
+    Returns (loaded, skipped) counts.
+    """
+    loaded = skipped = 0
+    for record in iter_job_records(path):
+        job = normalize_job(record)
+        if job is None:
+            skipped += 1
+            continue
+        index.add(job)
+        loaded += 1
+    index.table.compact()
+    return loaded, skipped
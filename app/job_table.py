@@ -0,0 +1,265 @@
+import copy
+import datetime
+import math
+import re
+from array import array
+
+import numpy as np
+
+# Salary periods recognised in free-text salaries; index = code stored in the salary_period column
+SALARY_PERIODS = ('unknown', 'hour', 'day', 'week', 'month', 'year')
+# Multiplier taking a salary in each SALARY_PERIODS period to a monthly figure
+# (26 working days a month, 8 hours a day); unknown periods stay unknown
+MONTHLY_FACTORS = (math.nan, 8 * 26, 26, 52 / 12, 1, 1 / 12)
+PERIOD_WORDS = {
+    'hour': 'hour', 'hourly': 'hour', 'hr': 'hour',
+    'day': 'day', 'daily': 'day',
+    'week': 'week', 'weekly': 'week',
+    'month': 'month', 'monthly': 'month', 'pm': 'month',
+    'year': 'year', 'yearly': 'year', 'annum': 'year', 'annually': 'year', 'pa': 'year',
+}
+_AMOUNT_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*(k|lakh|lakhs|lac|l)?\b', re.IGNORECASE)
+_PERIOD_RE = re.compile(r'\b(' + '|'.join(PERIOD_WORDS) + r')\b', re.IGNORECASE)
+_MULTIPLIERS = {'k': 1_000, 'lakh': 100_000, 'lakhs': 100_000, 'lac': 100_000, 'l': 100_000}
+
+_EPOCH = datetime.date(1970, 1, 1)
+# Stored in posted_day when posted_date can't be parsed
+UNKNOWN_DAY = -1
+
+# Rows a column buffers before merging them into its NumPy array
+_MIN_TAIL_ROWS = 65536
+
+
+def parse_salary(text):
+    """
+    Parse a free-text salary into (min, max, period), e.g.
+    "₹15,000 - ₹18,000 per month" -> (15000.0, 18000.0, 'month'),
+    "₹10,000 + Commission" -> (10000.0, 10000.0, 'month').
+    Amounts are nan and period 'unknown' when no number is found; a salary with
+    amounts but no period word is taken as monthly, the norm in our listings.
+    """
+    amounts = []
+    for number, suffix in _AMOUNT_RE.findall(text or ''):
+        value = float(number.replace(',', ''))
+        if suffix:
+            value *= _MULTIPLIERS[suffix.lower()]
+        elif value < 10:
+            continue  # durations and counts like "6 months", not pay
+        amounts.append(value)
+    if not amounts:
+        return math.nan, math.nan, 'unknown'
+    period = _PERIOD_RE.search(text)
+    return min(amounts), max(amounts), PERIOD_WORDS[period.group(1).lower()] if period else 'month'
+
+
+def parse_posted_day(text):
+    """
+    Days since 1970-01-01 for an ISO "YYYY-MM-DD" date, or UNKNOWN_DAY.
+    """
+    try:
+        return (datetime.date.fromisoformat(text[:10]) - _EPOCH).days
+    except (TypeError, ValueError):
+        return UNKNOWN_DAY
+
+
+class Dictionary:
+    """
+    Dictionary encoding for a repetitive column: each distinct value is stored once
+    and rows hold its integer code.
+    """
+
+    __slots__ = ('values', '_codes')
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def encode(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def code(self, value):
+        """
+        Code of an existing value, or None.
+        """
+        return self._codes.get(value)
+
+
+class _Column:
+    """
+    Append-friendly NumPy column. Appends go to a small typed `array` tail (cheap per
+    row); the tail is merged into the NumPy base once it is as long as the base, so
+    bulk loads stay linear. view() returns a NumPy array of every row.
+    """
+
+    __slots__ = ('_base', '_tail', '_dtype')
+
+    def __init__(self, dtype, typecode):
+        self._dtype = dtype
+        self._base = np.empty(0, dtype=dtype)
+        self._tail = array(typecode)
+
+    def __len__(self):
+        return len(self._base) + len(self._tail)
+
+    def append(self, value):
+        self._tail.append(value)
+        if len(self._tail) >= max(_MIN_TAIL_ROWS, len(self._base)):
+            self.compact()
+
+    def compact(self):
+        if self._tail:
+            self._base = np.concatenate((self._base, np.array(self._tail, dtype=self._dtype)))
+            self._tail = array(self._tail.typecode)
+
+    def __getitem__(self, pos):
+        base = self._base
+        return base[pos] if pos < len(base) else self._tail[pos - len(base)]
+
+    def copy(self):
+        # The NumPy base is replaced, never changed in place, so only the tail is copied
+        column = _Column.__new__(_Column)
+        column._dtype, column._base, column._tail = self._dtype, self._base, array(self._tail.typecode, self._tail)
+        return column
+
+    def view(self):
+        base, tail = self._base, self._tail
+        if not tail:
+            return base
+        return np.concatenate((base, np.array(tail, dtype=self._dtype)))
+
+
+class JobTable:
+    """
+    Column-oriented storage for job listings.
+
+    Repetitive fields (title, company, location, job_type, gender_preference, the salary
+    and date text, and the requirement lists) are dictionary-encoded into uint32 code
+    columns; id and description are plain string lists. The salary is parsed once at
+    load into salary_min / salary_max / salary_period columns, and posted_date into a
+    day number, so filters and sorting on them can run vectorized over NumPy arrays.
+    row() rebuilds the original job dict only when a job is actually displayed.
+
+    copy() gives a table that can take appends while readers keep using this one.
+    """
+
+    CATEGORICAL = ('title', 'company', 'location', 'salary', 'job_type', 'posted_date',
+                   'gender_preference', 'requirements')
+    # Key order of the dicts returned by row(), matching mock_jobs.json
+    FIELDS = ('id', 'title', 'company', 'location', 'salary', 'description', 'requirements',
+              'job_type', 'posted_date', 'gender_preference')
+
+    def __init__(self):
+        self.dictionaries = {name: Dictionary() for name in self.CATEGORICAL}
+        self._codes = {name: _Column(np.uint32, 'I') for name in self.CATEGORICAL}
+        self._ids = []
+        self._descriptions = []
+        self._salary_min = _Column(np.float32, 'f')
+        self._salary_max = _Column(np.float32, 'f')
+        self._salary_period = _Column(np.uint8, 'B')
+        self._posted_day = _Column(np.int32, 'i')
+        # Parsed salary / date per dictionary code, so each distinct text is parsed once
+        self._parsed_salaries = []
+        self._parsed_days = []
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, job):
+        """
+        Store a job dict as a new row and return its position.
+        """
+        codes = {}
+        for name in self.CATEGORICAL:
+            value = job.get(name, '')
+            if name == 'requirements':
+                value = tuple(value or ())
+            codes[name] = code = self.dictionaries[name].encode(value)
+            self._codes[name].append(code)
+        self._ids.append(job.get('id'))
+        self._descriptions.append(job.get('description', ''))
+
+        if codes['salary'] == len(self._parsed_salaries):
+            salary_min, salary_max, period = parse_salary(job.get('salary', ''))
+            self._parsed_salaries.append((salary_min, salary_max, SALARY_PERIODS.index(period)))
+        salary_min, salary_max, period_code = self._parsed_salaries[codes['salary']]
+        self._salary_min.append(salary_min)
+        self._salary_max.append(salary_max)
+        self._salary_period.append(period_code)
+
+        if codes['posted_date'] == len(self._parsed_days):
+            self._parsed_days.append(parse_posted_day(job.get('posted_date', '')))
+        self._posted_day.append(self._parsed_days[codes['posted_date']])
+        self._size += 1
+        return self._size - 1
+
+    def copy(self):
+        """
+        A table with the same rows, to append to while readers keep using this one.
+
+        The dictionaries and the id/description lists are append-only and shared (this
+        table never looks past its own length); each NumPy column gets its own tail, so
+        the copy costs about as much as the rows appended since the last compact().
+        Append only to the copy afterwards.
+        """
+        table = copy.copy(self)
+        table._codes = {name: column.copy() for name, column in self._codes.items()}
+        table._salary_min = self._salary_min.copy()
+        table._salary_max = self._salary_max.copy()
+        table._salary_period = self._salary_period.copy()
+        table._posted_day = self._posted_day.copy()
+        return table
+
+    def compact(self):
+        """
+        Merge buffered rows into the NumPy columns (call after a bulk load).
+        """
+        for column in (*self._codes.values(), self._salary_min, self._salary_max,
+                       self._salary_period, self._posted_day):
+            column.compact()
+
+    def value(self, pos, name):
+        """
+        A single field of a row, without building the whole dict.
+        """
+        if name == 'id':
+            return self._ids[pos]
+        if name == 'description':
+            return self._descriptions[pos]
+        value = self.dictionaries[name].values[self._codes[name][pos]]
+        return list(value) if name == 'requirements' else value
+
+    def row(self, pos):
+        """
+        Materialize row `pos` as a job dict.
+        """
+        return {name: self.value(pos, name) for name in self.FIELDS}
+
+    def codes(self, name):
+        """
+        NumPy view of a categorical column's codes.
+        """
+        return self._codes[name].view()
+
+    @property
+    def salary_min(self):
+        return self._salary_min.view()
+
+    @property
+    def salary_max(self):
+        return self._salary_max.view()
+
+    @property
+    def salary_period(self):
+        return self._salary_period.view()
+
+    @property
+    def posted_day(self):
+        return self._posted_day.view()
@@ -0,0 +1,282 @@
+import bisect
+import cProfile
+import functools
+import inspect
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 65536)
+
+# Port for the /metrics endpoint (0 disables it)
+METRICS_PORT = int(os.getenv("JOBSEVAK_METRICS_PORT", "0"))
+# Fraction of chat turns run under cProfile (0 disables profiling), and where the .prof files go
+PROFILE_SAMPLE_RATE = float(os.getenv("JOBSEVAK_PROFILE_SAMPLE", "0"))
+PROFILE_DIR = os.getenv("JOBSEVAK_PROFILE_DIR", "profiles")
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus style: count, sum and per-bucket counts.
+    """
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """
+        Estimate of the q-quantile: the upper bound of the bucket that holds it.
+        """
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+def _label_text(labels):
+    return ",".join(f'{key}="{value}"' for key, value in labels)
+
+
+class MetricsRegistry:
+    """
+    In-process counters and histograms, keyed by metric name and label values.
+
+    Updates take one lock and do a dict lookup plus a bisect, so instrumentation can stay
+    on in production. Export with to_prometheus() (text exposition format) or to_dict().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}     # (name, labels) -> value
+        self._histograms = {}   # (name, labels) -> Histogram
+        self._help = {}
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, stage):
+        """
+        Time the body of a `with` block into jobsevak_stage_seconds{stage=...}.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("jobsevak_stage_seconds", time.perf_counter() - start, stage=stage)
+
+    def timed(self, stage):
+        """
+        Decorator version of timer(). Coroutine functions are timed until they return
+        and generator functions until they are exhausted or closed.
+        """
+        def decorator(fn):
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def wrapper(*args, **kwargs):
+                    with self.timer(stage):
+                        return await fn(*args, **kwargs)
+            elif inspect.isgeneratorfunction(fn):
+                @functools.wraps(fn)
+                def wrapper(*args, **kwargs):
+                    with self.timer(stage):
+                        return (yield from fn(*args, **kwargs))
+            else:
+                @functools.wraps(fn)
+                def wrapper(*args, **kwargs):
+                    with self.timer(stage):
+                        return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def counter(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def histogram(self, name, **labels):
+        with self._lock:
+            return self._histograms.get((name, tuple(sorted(labels.items()))))
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def to_dict(self):
+        """
+        Snapshot of every metric, JSON-serializable.
+        """
+        with self._lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            histograms = [{"name": name, "labels": dict(labels), "count": h.count, "sum": h.sum,
+                           "p50": h.quantile(0.5), "p95": h.quantile(0.95), "p99": h.quantile(0.99),
+                           "buckets": dict(zip(map(str, h.buckets + (float('inf'),)), h.counts))}
+                          for (name, labels), h in sorted(self._histograms.items())]
+        return {"counters": counters, "histograms": histograms}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self):
+        """
+        All metrics in the Prometheus text exposition format.
+        """
+        lines, described = [], set()
+
+        def header(name, kind):
+            if name not in described:
+                described.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                header(name, "counter")
+                lines.append(f"{name}{{{_label_text(labels)}}} {value}" if labels else f"{name} {value}")
+            for (name, labels), h in sorted(self._histograms.items()):
+                header(name, "histogram")
+                cumulative = 0
+                for bound, count in zip(h.buckets + (float('inf'),), h.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float('inf') else repr(bound)
+                    lines.append(f"{name}_bucket{{{_label_text(labels + (('le', le),))}}} {cumulative}")
+                suffix = f"{{{_label_text(labels)}}}" if labels else ""
+                lines.append(f"{name}_sum{suffix} {h.sum}")
+                lines.append(f"{name}_count{suffix} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+_registry = MetricsRegistry()
+_registry.describe("jobsevak_stage_seconds", "Time spent in each stage of a chat turn.")
+_registry.describe("jobsevak_prompt_tokens", "Prompt size in tokens.")
+_registry.describe("jobsevak_prompt_bytes", "Prompt size in UTF-8 bytes.")
+_registry.describe("jobsevak_response_tokens", "Reply size in tokens.")
+_registry.describe("jobsevak_response_bytes", "Reply size in UTF-8 bytes.")
+_registry.describe("jobsevak_response_cache_total", "Response cache lookups by result.")
+_registry.describe("jobsevak_upstream_retries_total", "Model API retries by client and reason.")
+_registry.describe("jobsevak_errors_total", "Chat turns that ended in an error, by kind.")
+
+
+def get_metrics():
+    """
+    Return the process-wide MetricsRegistry.
+    """
+    return _registry
+
+
+_profile_lock = threading.Lock()
+
+
+@contextmanager
+def profile_turn(sample_rate=PROFILE_SAMPLE_RATE, output_dir=PROFILE_DIR):
+    """
+    Run the body under cProfile for a random `sample_rate` fraction of calls and write
+    the stats to `output_dir`/turn-<time>.prof (open with pstats or snakeviz). Only one
+    turn is profiled at a time; the others run unprofiled.
+    """
+    if sample_rate <= 0 or random.random() >= sample_rate or not _profile_lock.acquire(blocking=False):
+        yield
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(output_dir, f"turn-{time.time():.6f}.prof"))
+        except OSError as e:
+            print(f"Could not write turn profile: {e}")
+    finally:
+        _profile_lock.release()
+
+
+def profiled(fn):
+    """
+    Decorator running a sampled fraction of calls under profile_turn(); generator
+    functions are profiled until they are exhausted or closed.
+    """
+    if inspect.isgeneratorfunction(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with profile_turn():
+                return (yield from fn(*args, **kwargs))
+    else:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with profile_turn():
+                return fn(*args, **kwargs)
+    return wrapper
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body, content_type = get_metrics().to_json().encode("utf-8"), "application/json"
+        elif self.path.startswith("/metrics"):
+            body, content_type = get_metrics().to_prometheus().encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=METRICS_PORT, host="0.0.0.0"):
+    """
+    Serve /metrics (Prometheus text) and /metrics.json from a daemon thread, once per
+    process. Does nothing when port is 0. Returns the server, or None.
+    """
+    global _server
+    with _server_lock:
+        if _server is None and port:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        return _server
@@ -0,0 +1,183 @@
+import os
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+
+# Tokens the whole prompt may use; max_new_tokens for the reply come on top of this
+PROMPT_TOKEN_BUDGET = int(os.getenv("JOBSEVAK_PROMPT_TOKENS", "2048"))
+# Tokenizer matching the default model; loaded from the local Hugging Face cache when present
+TOKENIZER_NAME = os.getenv("JOBSEVAK_TOKENIZER", "meta-llama/Llama-3.1-8B-Instruct")
+# Counts of separately tokenized pieces are summed, which can be off by a token at each
+# boundary; this much of the budget is held back to cover that
+RESERVE_TOKENS = 16
+# Most tokens the user's query may take, so it can't crowd out the rest of the prompt
+QUERY_MAX_TOKENS = 512
+# Distinct static texts whose token counts are remembered
+MEMO_SIZE = 8192
+# Characters per token assumed when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+
+class TokenCounter:
+    """
+    Counts and truncates text in model tokens.
+
+    Uses a Hugging Face tokenizer when one is given, otherwise estimates tokens as
+    characters / CHARS_PER_TOKEN. count_static() memoizes counts for text that repeats
+    across turns (the instructions, FAQ entries, job lines).
+    """
+
+    def __init__(self, tokenizer=None, memo_size=MEMO_SIZE):
+        self.tokenizer = tokenizer
+        self.count_static = lru_cache(maxsize=memo_size)(self.count)
+
+    def count(self, text):
+        if not text:
+            return 0
+        if self.tokenizer is None:
+            return -(-len(text) // CHARS_PER_TOKEN)
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+
+    def truncate(self, text, max_tokens):
+        """
+        The longest prefix of text that fits in max_tokens.
+        """
+        if max_tokens <= 0:
+            return ""
+        if self.tokenizer is None:
+            return text[:max_tokens * CHARS_PER_TOKEN]
+        ids = self.tokenizer.encode(text, add_special_tokens=False)
+        if len(ids) <= max_tokens:
+            return text
+        return self.tokenizer.decode(ids[:max_tokens])
+
+
+def load_tokenizer(name=TOKENIZER_NAME):
+    """
+    Load `name` with transformers, preferring the local cache. Returns None (and the
+    caller falls back to estimating) if transformers or the tokenizer files are unavailable.
+    """
+    try:
+        from transformers import AutoTokenizer
+    except ImportError:
+        print("transformers is not installed; estimating prompt tokens from text length.")
+        return None
+    try:
+        return AutoTokenizer.from_pretrained(name, local_files_only=True)
+    except Exception:
+        pass
+    try:
+        # First run: download once into the Hugging Face cache
+        return AutoTokenizer.from_pretrained(name, token=os.getenv("HF_API_TOKEN"))
+    except Exception as e:
+        print(f"Could not load tokenizer {name}: {e}. Estimating prompt tokens from text length.")
+        return None
+
+
+@dataclass
+class PromptSection:
+    """
+    One part of the prompt.
+
+    `items` are rendered in order, joined by `separator`, between `header` and `footer`
+    (which are only emitted if at least one item is). `required` sections are budgeted
+    first, then the rest, each group in `priority` order, lowest first. When a section
+    doesn't fit, items are dropped from its end, or from its start with keep="last" (e.g.
+    keep the newest history turns). A `required` section always keeps its first item,
+    cut down to fit if `truncate` is set. `max_tokens` caps a section below the remaining
+    budget. `static` sections have their token counts memoized.
+    """
+    name: str
+    items: list
+    priority: int
+    header: str = ""
+    footer: str = ""
+    separator: str = ""
+    required: bool = False
+    truncate: bool = False
+    keep: str = "first"
+    static: bool = False
+    max_tokens: int = None
+
+
+class PromptBuilder:
+    """
+    Assembles PromptSections into a prompt that fits a token budget.
+    """
+
+    def __init__(self, counter, budget=PROMPT_TOKEN_BUDGET, reserve=RESERVE_TOKENS):
+        self.counter = counter
+        self.budget = budget
+        self.reserve = reserve
+
+    def build(self, sections):
+        """
+        Return (prompt, usage) where usage maps each section name to the tokens it got
+        (0 for dropped sections). Sections appear in the prompt in the order given.
+        """
+        remaining = self.budget - self.reserve
+        chosen = {}
+        for section in sorted(sections, key=lambda section: (not section.required, section.priority)):
+            items, used = self._fit(section, remaining)
+            chosen[section.name] = (items, used)
+            remaining -= used
+
+        parts, usage = [], {}
+        for section in sections:
+            items, used = chosen[section.name]
+            usage[section.name] = used
+            if items:
+                parts.append(section.header + section.separator.join(items) + section.footer)
+        return "".join(parts), usage
+
+    def _fit(self, section, remaining):
+        count = self.counter.count_static if section.static else self.counter.count
+        items = [item for item in section.items if item]
+        if not items:
+            return [], 0
+        if section.keep == "last":
+            items.reverse()
+        limit = remaining if section.max_tokens is None else min(remaining, section.max_tokens)
+
+        frame = count(section.header) + count(section.footer)
+        separator = count(section.separator) if section.separator else 0
+        kept, used = [], frame
+        for item in items:
+            cost = count(item) + (separator if kept else 0)
+            if used + cost <= limit:
+                kept.append(item)
+                used += cost
+            elif not kept and section.required:
+                # Required content is kept even over budget, cut down if allowed
+                if section.truncate:
+                    item = self.counter.truncate(item, max(limit - frame, 1))
+                    print(f"Prompt section '{section.name}' cut to {limit - frame} tokens to fit the budget.")
+                kept.append(item)
+                used += count(item)
+                if used > remaining:
+                    print(f"Prompt section '{section.name}' needs {used} tokens, over the "
+                          f"{remaining} left in the budget; the prompt will exceed {self.budget} tokens.")
+                break
+            else:
+                break
+
+        if not kept:
+            return [], 0
+        if section.keep == "last":
+            kept.reverse()
+        return kept, used
+
+
+_shared_counter = None
+_shared_counter_lock = threading.Lock()
+
+
+def get_token_counter():
+    """
+    Return the process-wide TokenCounter, loading the tokenizer on first use.
+    """
+    global _shared_counter
+    with _shared_counter_lock:
+        if _shared_counter is None:
+            _shared_counter = TokenCounter(load_tokenizer())
+        return _shared_counter
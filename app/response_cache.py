@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+MAX_ENTRIES = 1024
+MAX_BYTES = 4 * 1024 * 1024
+TTL_SECONDS = 6 * 60 * 60
+# Rows kept in the on-disk cache before the oldest are pruned, and how many writes between prunes
+MAX_DISK_ENTRIES = 100_000
+PRUNE_EVERY = 100
+# Seconds a sqlite write waits for another process's write to finish
+SQLITE_TIMEOUT = 5.0
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query):
+    """
+    Lowercase, drop punctuation and collapse whitespace, so "How do I post a job?" and
+    "how do i post a job" share a cache entry.
+    """
+    return _WHITESPACE_RE.sub(" ", _PUNCTUATION_RE.sub(" ", query.lower())).strip()
+
+
+def make_cache_key(query, intent, data_version):
+    """
+    Cache key from the normalized query, the extracted intent and the data version.
+    """
+    parts = [normalize_query(query), repr(intent), data_version]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+def connect_sqlite(path):
+    """
+    Open a sqlite file that several threads and worker processes use at once: WAL journal
+    (readers never block the writer or each other) and a busy timeout instead of failing
+    straight away with "database is locked".
+    """
+    db = sqlite3.connect(path, check_same_thread=False, timeout=SQLITE_TIMEOUT)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of model replies, bounded by entry count and total text size.
+
+    With `path`, entries are also written to a sqlite file so they survive restarts and
+    are shared by every process using the same file (e.g. API server workers); memory is
+    checked first and disk hits are promoted back into memory. Disk errors are logged
+    and treated as misses.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, ttl_seconds=TTL_SECONDS,
+                 path=None, clock=time.time):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+        self._writes = 0
+        if path:
+            self._db = connect_sqlite(path)
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, stored_at REAL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at)")
+            self._db.commit()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Return the cached value for key, or None if missing or expired.
+        """
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._evict(key)
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute("SELECT value, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+                except sqlite3.Error as e:
+                    print(f"Response cache read failed: {e}")
+                    row = None
+                if row is not None and now - row[1] <= self.ttl_seconds:
+                    self._store(key, row[0], row[1])
+                    self.hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            now = self._clock()
+            self._store(key, value, now)
+            if self._db is not None:
+                try:
+                    self._db.execute("INSERT OR REPLACE INTO responses (key, value, stored_at) VALUES (?, ?, ?)",
+                                     (key, value, now))
+                    self._writes += 1
+                    if self._writes % PRUNE_EVERY == 1:
+                        self._db.execute("DELETE FROM responses WHERE stored_at < ?", (now - self.ttl_seconds,))
+                        self._db.execute("DELETE FROM responses WHERE key NOT IN "
+                                         "(SELECT key FROM responses ORDER BY stored_at DESC LIMIT ?)",
+                                         (MAX_DISK_ENTRIES,))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    self._db.rollback()
+                    print(f"Response cache write failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _store(self, key, value, stored_at):
+        size = sys.getsizeof(value)
+        if size > self.max_bytes:
+            return
+        self._evict(key)
+        self._entries[key] = (stored_at, value)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= sys.getsizeof(entry[1])
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Return the process-wide ResponseCache. Set JOBSEVAK_CACHE_PATH to a sqlite file to
+    keep cached replies across restarts.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(path=os.getenv("JOBSEVAK_CACHE_PATH"))
+        return _shared_cache
@@ -0,0 +1,58 @@
+import json
+import sqlite3
+import threading
+import time
+
+from response_cache import connect_sqlite
+
+# Sessions untouched for this long are deleted
+SESSION_TTL_SECONDS = 24 * 60 * 60
+# Writes between removals of expired sessions
+PRUNE_EVERY = 100
+
+
+class SessionStore:
+    """
+    Conversation state (ConversationHistory.state()) by session id, in a sqlite file
+    shared by every API server worker, so any worker can serve any session's next turn.
+    Concurrent turns of the same session are not merged: the last one to finish wins.
+    """
+
+    def __init__(self, path, ttl_seconds=SESSION_TTL_SECONDS, clock=time.time):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._db = connect_sqlite(path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, state TEXT, updated_at REAL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+        self._db.commit()
+
+    def get(self, session_id):
+        """
+        The session's saved state, or None if it is unknown or expired.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT state, updated_at FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None or self._clock() - row[1] > self.ttl_seconds:
+            return None
+        return json.loads(row[0])
+
+    def put(self, session_id, state):
+        now = self._clock()
+        with self._lock:
+            try:
+                self._db.execute("INSERT OR REPLACE INTO sessions (id, state, updated_at) VALUES (?, ?, ?)",
+                                 (session_id, json.dumps(state, ensure_ascii=False), now))
+                self._writes += 1
+                if self._writes % PRUNE_EVERY == 1:
+                    self._db.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.ttl_seconds,))
+                self._db.commit()
+            except sqlite3.Error as e:
+                self._db.rollback()
+                print(f"Could not save session {session_id}: {e}")
+
+    def delete(self, session_id):
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            self._db.commit()
@@ -0,0 +1,152 @@
+import mmap
+import os
+import pickle
+import struct
+import threading
+
+from data_store import POLL_SECONDS, DataStore
+
+# File layout: MAGIC, header (pickle length, buffer count), (offset, length) per buffer,
+# the pickle, then each out-of-band buffer aligned to ALIGNMENT bytes
+MAGIC = b"JSSNAP1\n"
+_HEADER = struct.Struct("<QQ")
+_ENTRY = struct.Struct("<QQ")
+ALIGNMENT = 64
+
+# Name of the file in a snapshot directory that holds the current snapshot's file name
+CURRENT_FILE = "CURRENT"
+
+
+def dump_snapshot(snapshot, path):
+    """
+    Write a DataSnapshot to `path` (atomically, via a temporary file).
+
+    The snapshot is pickled with protocol 5 and its NumPy columns and postings are stored
+    out-of-band as raw aligned blocks, so load_snapshot_file() can map them straight
+    from the file instead of copying them.
+    """
+    snapshot.job_index.table.compact()
+    buffers = []
+    payload = pickle.dumps(snapshot, protocol=5, buffer_callback=buffers.append)
+    views = [buffer.raw() for buffer in buffers]
+
+    offset = len(MAGIC) + _HEADER.size + _ENTRY.size * len(views) + len(payload)
+    entries = []
+    for view in views:
+        offset += -offset % ALIGNMENT
+        entries.append((offset, view.nbytes))
+        offset += view.nbytes
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER.pack(len(payload), len(views)))
+        for entry in entries:
+            f.write(_ENTRY.pack(*entry))
+        f.write(payload)
+        for (start, _), view in zip(entries, views):
+            f.write(b"\0" * (start - f.tell()))
+            f.write(view)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_snapshot_file(path):
+    """
+    Load a DataSnapshot written by dump_snapshot().
+
+    The file is memory-mapped read-only and the NumPy arrays are views into the mapping,
+    so every process loading the same file shares one copy of them in the page cache.
+    Only the Python objects (dictionaries, ids, text) are rebuilt per process.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a snapshot file")
+    position = len(MAGIC)
+    payload_length, count = _HEADER.unpack_from(mapped, position)
+    position += _HEADER.size
+    view = memoryview(mapped)
+    buffers = []
+    for _ in range(count):
+        start, length = _ENTRY.unpack_from(mapped, position)
+        position += _ENTRY.size
+        buffers.append(view[start:start + length])
+    return pickle.loads(view[position:position + payload_length], buffers=buffers)
+
+
+def publish_snapshot(snapshot, directory):
+    """
+    Write `snapshot` into `directory` and make it the current one for SharedDataStores
+    following that directory. Older snapshot files are removed (processes that still
+    have one mapped keep reading it until they switch).
+    """
+    os.makedirs(directory, exist_ok=True)
+    name = f"snapshot-{snapshot.version}-{snapshot.generation}.bin"
+    dump_snapshot(snapshot, os.path.join(directory, name))
+    tmp_path = os.path.join(directory, f"{CURRENT_FILE}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(tmp_path, os.path.join(directory, CURRENT_FILE))
+    for old in os.listdir(directory):
+        if old.startswith("snapshot-") and old != name:
+            try:
+                os.remove(os.path.join(directory, old))
+            except OSError:
+                pass
+    return os.path.join(directory, name)
+
+
+def current_snapshot_name(directory):
+    try:
+        with open(os.path.join(directory, CURRENT_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+class SharedDataStore(DataStore):
+    """
+    DataStore for worker processes: instead of parsing the data files it follows the
+    snapshot a coordinating process published into `directory` with publish_snapshot(),
+    swapping to each new one the same way DataStore swaps after a reload.
+
+    A process forked from the publisher can pass the `snapshot` it inherited together
+    with the `name` it was published under; it then keeps using those pages (shared
+    copy-on-write with the publisher) until a newer snapshot is published.
+    """
+
+    def __init__(self, directory, snapshot=None, name=None):
+        self.directory = directory
+        self._name = name if snapshot is not None else current_snapshot_name(directory)
+        if self._name is None:
+            raise FileNotFoundError(f"No published snapshot in {directory}")
+        if snapshot is None:
+            snapshot = load_snapshot_file(os.path.join(directory, self._name))
+        super().__init__(snapshot=snapshot)
+
+    def reload(self):
+        name = current_snapshot_name(self.directory)
+        if name is None:
+            return self._snapshot
+        try:
+            snapshot = load_snapshot_file(os.path.join(self.directory, name))
+        except (OSError, ValueError, pickle.UnpicklingError) as e:
+            print(f"Could not load shared snapshot {name}: {e}. Keeping the previously loaded data.")
+            return self._snapshot
+        with self._lock:
+            self._snapshot = snapshot
+            self._name = name
+        return snapshot
+
+    def reload_if_changed(self):
+        if current_snapshot_name(self.directory) not in (None, self._name):
+            return self.reload()
+        return self._snapshot
+
+    def start_watching(self, interval=POLL_SECONDS):
+        if interval <= 0 or self._watcher is not None:
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name="snapshot-watcher", daemon=True)
+        self._watcher.start()
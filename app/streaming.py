@@ -0,0 +1,113 @@
+import json
+
+ASSISTANT_MARKER = "JobSevak:"
+USER_MARKER = "User:"
+
+
+def iter_sse_tokens(response):
+    """
+    Yield token texts from a text-generation-inference server-sent-events response.
+    Each event looks like `data: {"token": {"text": "...", "special": false}, ...}`.
+    """
+    # chunk_size=None hands over bytes as soon as they arrive instead of waiting for 512.
+    # Lines are decoded here: without a charset requests would assume ISO-8859-1, but
+    # event streams are always UTF-8
+    for line in response.iter_lines(chunk_size=None):
+        line = line.decode("utf-8", errors="replace")
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        try:
+            event = json.loads(data)
+        except ValueError:
+            continue
+        if 'error' in event:
+            raise ValueError(f"Model API Error: {event['error']}")
+        token = event.get('token') or {}
+        if token.get('special'):
+            continue
+        text = token.get('text')
+        if text:
+            yield text
+
+
+class StreamingResponseCleaner:
+    """
+    Incremental "JobSevak:"/"User:" cleanup; clean_reply() applies it to a full reply,
+    so streamed and non-streamed replies (which share the response cache) always match.
+
+    Feed tokens as they arrive and forward whatever comes back. One leading "JobSevak:"
+    prefix is dropped, and the reply ends at the first "User:" or further "JobSevak:"
+    marker (the start of a simulated conversation). Only a possible partial marker and
+    trailing whitespace at the end of the text are held back, never the whole reply, so
+    the pieces joined are exactly clean_reply() of the whole output.
+    """
+
+    MARKERS = (USER_MARKER, ASSISTANT_MARKER)
+
+    def __init__(self):
+        self._pending = ""
+        self._prefix_checked = False
+        self._started = False
+        self.done = False
+
+    def feed(self, text):
+        """
+        Add a chunk of model output and return the text that is safe to display.
+        """
+        if self.done:
+            return ""
+        self._pending += text
+        if not self._started:
+            self._pending = self._pending.lstrip()
+            if not self._prefix_checked:
+                if ASSISTANT_MARKER.startswith(self._pending):
+                    return ""  # may still turn out to be the prefix
+                if self._pending.startswith(ASSISTANT_MARKER):
+                    self._pending = self._pending[len(ASSISTANT_MARKER):].lstrip()
+                self._prefix_checked = True
+            if not self._pending:
+                return ""
+            self._started = True
+
+        cuts = [self._pending.find(marker) for marker in self.MARKERS]
+        cuts = [cut for cut in cuts if cut >= 0]
+        if cuts:
+            out = self._pending[:min(cuts)].rstrip()
+            self._pending = ""
+            self.done = True
+            return out
+
+        keep = len(self._pending) - self._partial_marker_length(self._pending)
+        out = self._pending[:keep].rstrip()
+        self._pending = self._pending[len(out):]
+        return out
+
+    def flush(self):
+        """
+        Return any held-back text once the stream has ended.
+        """
+        out = "" if self.done else self._pending.rstrip()
+        self._pending = ""
+        self.done = True
+        return out
+
+    def _partial_marker_length(self, text):
+        # Longest suffix of text that is the beginning of a marker
+        longest = 0
+        for marker in self.MARKERS:
+            for size in range(min(len(marker) - 1, len(text)), longest, -1):
+                if text.endswith(marker[:size]):
+                    longest = size
+                    break
+        return longest
+
+
+def clean_reply(text):
+    """
+    The reply StreamingResponseCleaner would stream for the whole of `text`.
+    """
+    cleaner = StreamingResponseCleaner()
+    return cleaner.feed(text) + cleaner.flush()
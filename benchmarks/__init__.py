@@ -0,0 +1,5 @@
+"""
+Benchmarks for JobSevak. Each module is a standalone script (run it with python, see its
+docstring); suite.py runs the main scenarios on synthetic data and writes JSON results,
+synthetic.py generates the data and mock_inference_server.py stands in for the model API.
+"""
@@ -0,0 +1,110 @@
+"""
+Benchmark: voice input processing cost and upload size for a recording with pauses.
+
+"Old" is the previous path: keep every 48 kHz frame, concatenate at the end and upload one
+48 kHz WAV. "Pipeline" is AudioPipeline: per-frame downmix/resample/VAD on the capture
+thread, speech chunks transcribed (here by a StubTranscriber with a fixed delay standing in
+for the Whisper API) while recording, so only the last chunk is waited on after "stop".
+It runs once per upload codec (WAV and Opus); upload sizes are the bytes the transcriber
+actually received. Frames are replayed at REPLAY_SPEED times real time.
+
+Usage: python benchmarks/bench_audio.py
+"""
+import io
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from audio import AudioPipeline, StubTranscriber  # noqa: E402
+
+RATE = 48000
+FRAME = 960  # 20 ms WebRTC frames
+SECONDS = 60
+TRANSCRIBE_DELAY = 0.5  # seconds per upload
+REPLAY_SPEED = 10  # frames are fed this many times faster than real time
+
+
+class DelayedTranscriber(StubTranscriber):
+    def __init__(self):
+        super().__init__()
+        self.uploaded_bytes = 0
+        self.mime_types = set()
+
+    def transcribe(self, audio_bytes, filename="audio.wav", mime_type="audio/wav"):
+        with self._lock:
+            self.uploaded_bytes += len(audio_bytes)
+            self.mime_types.add(mime_type)
+        time.sleep(TRANSCRIBE_DELAY)
+        return super().transcribe(audio_bytes, filename, mime_type)
+
+
+def make_recording(seed=0):
+    """
+    Stereo int16 "speech" (tone bursts of 1-4 s) separated by 0.5-2 s pauses over background noise.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(RATE * SECONDS) / RATE
+    signal = rng.normal(0, 0.003, len(t))
+    position = 1.0
+    while position < SECONDS - 1:
+        length = rng.uniform(1, 4)
+        burst = (t >= position) & (t < position + length)
+        signal[burst] += 0.3 * np.sin(2 * np.pi * rng.uniform(150, 300) * t[burst])
+        position += length + rng.uniform(0.5, 2)
+    pcm = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+    return np.repeat(pcm, 2).reshape(1, -1)  # packed stereo, as av.AudioFrame.to_ndarray() returns
+
+
+def old_path(frames):
+    start = time.perf_counter()
+    kept = [frame.copy() for frame in frames]
+    audio = np.concatenate(kept, axis=1)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(RATE)
+        wav_file.writeframes(audio.tobytes())
+    return time.perf_counter() - start, len(buffer.getvalue())
+
+
+def pipeline_path(frames, codec):
+    transcriber = DelayedTranscriber()
+    pipeline = AudioPipeline(transcriber, codec=codec)
+    pipeline.start()
+    per_frame = []
+    for frame in frames:
+        start = time.perf_counter()
+        pipeline.feed(frame, RATE, channels=2)
+        per_frame.append(time.perf_counter() - start)
+        time.sleep(FRAME / RATE / REPLAY_SPEED)  # frames arrive over time
+    start = time.perf_counter()
+    pipeline.finish()
+    wait = time.perf_counter() - start
+    return per_frame, wait, transcriber
+
+
+def main():
+    recording = make_recording()
+    frames = [recording[:, i:i + FRAME * 2] for i in range(0, recording.shape[1], FRAME * 2)]
+    print(f"{SECONDS}s stereo recording at {RATE} Hz, {len(frames)} frames")
+
+    elapsed, size = old_path(frames)
+    print(f"old:      encode {elapsed * 1000:.0f} ms after stop, one {size / 1e6:.2f} MB upload transcribed after stop")
+
+    for codec in ("wav", "opus"):
+        per_frame, wait, transcriber = pipeline_path(frames, codec)
+        per_frame_us = np.array(per_frame) * 1e6
+        sent = ", ".join(sorted(transcriber.mime_types))
+        print(f"pipeline ({codec}): {np.median(per_frame_us):.0f} us/frame median, "
+              f"{np.percentile(per_frame_us, 99):.0f} us p99; {transcriber.calls} chunk uploads, "
+              f"{transcriber.uploaded_bytes / 1e6:.2f} MB uploaded as {sent}, wait after stop {wait:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
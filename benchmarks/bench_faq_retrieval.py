@@ -0,0 +1,49 @@
+"""
+Benchmark: FAQ tokens per prompt and BM25 retrieval latency at different FAQ corpus sizes.
+
+"All FAQs" is the old behaviour of embedding the whole corpus in every prompt; "retrieved"
+is the top-k block the chatbot injects now. Tokens are approximated as characters / 4.
+
+Usage: python benchmarks/bench_faq_retrieval.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from faq_retriever import FAQRetriever  # noqa: E402
+from synthetic import make_faqs  # noqa: E402
+
+FAQ_COUNTS = [10, 1_000, 100_000]
+QUERIES = ["How do I post a job?", "what does premium listing cost", "can women apply for night shifts",
+           "how to change my registered phone number", "jobs in Warangal"]
+TOP_K = 3
+MIN_SCORE = 1.0
+
+
+def approx_tokens(faqs):
+    return len("\n".join(f"Q: {faq['question']}\nA: {faq['answer']}" for faq in faqs)) // 4
+
+
+def main():
+    print(f"{'faqs':>8} {'build s':>8} {'search ms':>10} {'all-FAQ tokens':>15} {'retrieved tokens':>17}")
+    for count in FAQ_COUNTS:
+        faqs = make_faqs(count)
+        start = time.perf_counter()
+        retriever = FAQRetriever(faqs)
+        build_s = time.perf_counter() - start
+
+        rounds = 20
+        retrieved_tokens = 0
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for query in QUERIES:
+                retrieved_tokens += approx_tokens(retriever.search(query, top_k=TOP_K, min_score=MIN_SCORE))
+        search_ms = (time.perf_counter() - start) / (rounds * len(QUERIES)) * 1000
+        retrieved_tokens //= rounds * len(QUERIES)
+        print(f"{count:>8} {build_s:>8.3f} {search_ms:>10.3f} {approx_tokens(faqs):>15} {retrieved_tokens:>17}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark: load time and peak RSS for job feeds of different sizes.
+
+Compares the old path (json.load of the whole {"jobs": [...]} document, then indexing)
+with streaming ingestion from the same JSON document and from JSONL. Every measurement
+runs in a fresh subprocess so peak RSS is not polluted by earlier runs.
+
+Usage: python benchmarks/bench_ingest.py [--sizes 10000 1000000 5000000]
+Large sizes need several GB of disk in the temp directory.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+sys.path.insert(0, APP_DIR)
+
+from synthetic import write_job_feeds  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 1_000_000, 5_000_000]
+
+
+def run_worker(mode, path):
+    from job_index import JobIndex
+    from job_ingest import ingest_jobs, normalize_job
+
+    start = time.perf_counter()
+    index = JobIndex()
+    if mode == "json.load":
+        with open(path, "r", encoding="utf-8") as f:
+            for record in json.load(f)["jobs"]:
+                index.add(normalize_job(record))
+    else:
+        ingest_jobs(path, index)
+    seconds = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": seconds, "peak_rss_mb": peak_kb / 1024, "jobs": len(index)}))
+
+
+def measure(mode, path):
+    output = subprocess.run([sys.executable, __file__, "--worker", mode, path],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark job feed ingestion.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--worker", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        run_worker(*args.worker)
+        return
+
+    print(f"{'jobs':>10} {'mode':>16} {'load s':>8} {'peak RSS MB':>12}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            json_path, jsonl_path = write_job_feeds(directory, size)
+            for mode, path in (("json.load", json_path), ("stream json", json_path), ("stream jsonl", jsonl_path)):
+                result = measure(mode, path)
+                print(f"{size:>10} {mode:>16} {result['seconds']:>8.2f} {result['peak_rss_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: ranked job search (JobIndex.search) over a synthetic corpus.
+
+Reports index build time, per-query latency for a mix of filter / salary / recency /
+keyword queries, the old unranked JobIndex.query() for reference, and top-k selection
+with argpartition versus a full argsort of every candidate's score.
+
+Usage: python benchmarks/bench_job_search.py [--jobs 1000000] [--repeat 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import numpy as np  # noqa: E402
+
+from synthetic import FEED_DATE, iter_jobs  # noqa: E402
+from job_index import JobIndex  # noqa: E402
+
+QUERIES = [
+    {"location": "Warangal"},
+    {"location": "Guntur", "job_type": "Part-time", "gender_preference": "Female"},
+    {"min_salary": 25_000},
+    {"location": "Tirupati", "min_salary": 15_000, "max_salary": 20_000},
+    {"posted_within_days": 7},
+    {"keywords": ("driver", "license")},
+    {"location": "Nellore", "keywords": ("computer",), "posted_within_days": 14},
+    {"keywords": ("delivery", "two", "wheeler"), "min_salary": 12_000},
+]
+TOP_K = 3
+
+
+def build_index(count, seed=0):
+    index = JobIndex()
+    for job in iter_jobs(count, seed):
+        index.add(job)
+    index.table.compact()
+    return index
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ranked job search.")
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build_index(args.jobs)
+    print(f"Indexed {len(index):,} jobs in {time.perf_counter() - start:.1f}s\n")
+
+    print(f"{'query':<80} {'search ms':>10} {'hits':>5}")
+    for query in QUERIES:
+        ms, results = timed(lambda: index.search(limit=TOP_K, today=FEED_DATE, **query), args.repeat)
+        print(f"{str(query):<80} {ms:>10.2f} {len(results):>5}")
+
+    ms, _ = timed(lambda: index.query("Warangal", limit=TOP_K), args.repeat)
+    print(f"\nUnranked query(location='Warangal', limit={TOP_K}): {ms:.2f} ms")
+
+    scores = np.random.default_rng(0).random(args.jobs, dtype=np.float32)
+    sort_ms, _ = timed(lambda: np.argsort(-scores)[:TOP_K], args.repeat)
+    partition_ms, _ = timed(lambda: np.argpartition(-scores, TOP_K - 1)[:TOP_K], args.repeat)
+    print(f"Top-{TOP_K} of {args.jobs:,} scores: full argsort {sort_ms:.2f} ms, argpartition {partition_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Micro-benchmark: prompt build time against FAQ count.
+
+"rebuild" is the old per-turn work (join every city and format every FAQ into the prompt);
+"cached" is the current path (cached static prefix plus top-k retrieved FAQs).
+
+Usage: python benchmarks/bench_prompt.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from chatbot import JobChatBot  # noqa: E402
+from data_store import SYSTEM_INSTRUCTIONS, DataSnapshot, DataStore, load_snapshot  # noqa: E402
+
+FAQ_COUNTS = [10, 100, 1000, 10000]
+QUERY = "Any part-time jobs for women in Warangal?"
+
+
+def make_faqs(count):
+    return [
+        {"question": f"Sample question number {i} about posting jobs?",
+         "answer": f"Sample answer number {i}. Open the Lokal app and follow the steps in section {i}."}
+        for i in range(count)
+    ]
+
+
+def rebuild_prompt(bot, query):
+    prompt = SYSTEM_INSTRUCTIONS
+    prompt += f"Available cities for job search: {', '.join(bot.cities)}.\n\n"
+    faq_text = "\n".join([f"Q: {faq['question']}\nA: {faq['answer']}" for faq in bot.faqs])
+    prompt += f"Reference FAQs:\n{faq_text}\n\n"
+    job_data_context = bot.get_job_data_context(query)
+    if job_data_context:
+        prompt += f"Relevant job listings for this query:\n{job_data_context}\n\n"
+    return f"{prompt}Current query - User: {query}\n\nYour response (respond ONLY as JobSevak):"
+
+
+def main():
+    base = load_snapshot()
+    print(f"{'faqs':>8} {'rebuild ms':>11} {'cached ms':>10} {'rebuild chars':>14} {'cached chars':>13}")
+    for count in FAQ_COUNTS:
+        snapshot = DataSnapshot(make_faqs(count), base.jobs, base.cities)
+        bot = JobChatBot(hf_api_token="benchmark", data=DataStore(snapshot=snapshot))
+        bot.get_system_prompt_and_context(QUERY)
+        number = max(1, 2000 // count)
+
+        rebuild_ms = timeit.timeit(lambda: rebuild_prompt(bot, QUERY), number=number) / number * 1000
+        cached_ms = timeit.timeit(lambda: bot.get_system_prompt_and_context(QUERY), number=number) / number * 1000
+        rebuild_chars = len(rebuild_prompt(bot, QUERY))
+        cached_chars = len(bot.get_system_prompt_and_context(QUERY))
+        print(f"{count:>8} {rebuild_ms:>11.3f} {cached_ms:>10.3f} {rebuild_chars:>14} {cached_chars:>13}")
+
+
+if __name__ == "__main__":
+    main()
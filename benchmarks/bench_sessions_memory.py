@@ -0,0 +1,60 @@
+"""
+Memory benchmark: N chat sessions each loading a private copy of the data (the old
+one-JobChatBot-per-session behaviour) versus N sessions sharing one DataStore.
+
+Usage: python benchmarks/bench_sessions_memory.py
+"""
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from chatbot import JobChatBot  # noqa: E402
+from data_store import DataStore  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+from synthetic import write_data_dir  # noqa: E402
+
+SESSION_COUNTS = [1, 10, 50]
+JOB_COUNT = 5_000
+FAQ_COUNT = 200
+
+
+def measure(make_bot, sessions):
+    gc.collect()
+    tracemalloc.start()
+    bots = [make_bot() for _ in range(sessions)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del bots
+    return current / (1024 * 1024)
+
+
+def measure_shared(data_dir, cache, sessions):
+    gc.collect()
+    tracemalloc.start()
+    shared = DataStore(data_dir)
+    bots = [JobChatBot("benchmark", response_cache=cache, data=shared) for _ in range(sessions)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del bots, shared
+    return current / (1024 * 1024)
+
+
+def main():
+    cache = ResponseCache()
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_data_dir(data_dir, JOB_COUNT, FAQ_COUNT)
+        print(f"{JOB_COUNT} jobs, {FAQ_COUNT} FAQs")
+        print(f"{'sessions':>9} {'private MB':>11} {'shared MB':>10}")
+        for sessions in SESSION_COUNTS:
+            private_mb = measure(lambda: JobChatBot("benchmark", response_cache=cache, data=DataStore(data_dir)),
+                                 sessions)
+            shared_mb = measure_shared(data_dir, cache, sessions)
+            print(f"{sessions:>9} {private_mb:>11.1f} {shared_mb:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Load test: N concurrent simulated users chatting against a local mock inference server.
+
+Each user is its own JobChatBot session sending `--turns` messages. In async mode all users
+share one event loop through JobChatBot.achat; in sync mode each user gets a thread calling
+JobChatBot.chat, which is how the Streamlit app serves them. Reports p50/p95/p99 turn latency
+and throughput, optionally as JSON.
+
+Usage: python benchmarks/load_test.py --users 200 --turns 3 --latency 0.5 --mode async
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from mock_inference_server import MockInferenceServer  # noqa: E402
+
+QUERIES = ["How do I post a job?", "jobs in Warangal", "part-time jobs for women in Guntur",
+           "what does premium listing cost", "full time work in Nellore"]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def user_messages(user, turns, unique):
+    # unique=True gives every user different text so requests can't be cached or coalesced
+    for turn in range(turns):
+        message = QUERIES[(user + turn) % len(QUERIES)]
+        yield f"{message} (user {user})" if unique else message
+
+
+def make_bot():
+    from chatbot import JobChatBot
+    from response_cache import ResponseCache
+    return JobChatBot("load-test", response_cache=ResponseCache())
+
+
+async def run_async(users, turns, unique, deadline, max_concurrency):
+    from async_client import get_async_inference_client
+    latencies = []
+    client = get_async_inference_client()
+    client.max_concurrency = max_concurrency
+
+    async def user_session(user):
+        bot = make_bot()
+        for message in user_messages(user, turns, unique):
+            start = time.perf_counter()
+            await bot.achat(message, deadline=deadline)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(user_session(user) for user in range(users)))
+    await client.close()
+    return latencies, {"upstream_calls": client.upstream_calls, "coalesced_calls": client.coalesced_calls}
+
+
+def run_sync(users, turns, unique):
+    latencies = []
+
+    def user_session(user):
+        bot = make_bot()
+        for message in user_messages(user, turns, unique):
+            start = time.perf_counter()
+            bot.chat(message)
+            latencies.append(time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        list(pool.map(user_session, range(users)))
+    return latencies, {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the chat engine against a mock inference server.")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.5, help="mock server latency in seconds")
+    parser.add_argument("--mode", choices=["async", "sync"], default="async")
+    parser.add_argument("--deadline", type=float, default=30.0, help="per-request deadline (async mode)")
+    parser.add_argument("--max-concurrency", type=int, default=32, help="upstream concurrency limit (async mode)")
+    parser.add_argument("--shared-queries", action="store_true",
+                        help="send identical queries from every user so in-flight requests coalesce")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    with MockInferenceServer(latency=args.latency) as server:
+        os.environ["MODEL_API_URL"] = server.url
+        import inference_backend
+        inference_backend.MODEL_API_URL = server.url
+
+        start = time.perf_counter()
+        if args.mode == "async":
+            latencies, extra = asyncio.run(run_async(args.users, args.turns, not args.shared_queries,
+                                                   args.deadline, args.max_concurrency))
+        else:
+            latencies, extra = run_sync(args.users, args.turns, not args.shared_queries)
+        elapsed = time.perf_counter() - start
+
+    results = {
+        "mode": args.mode,
+        "users": args.users,
+        "turns": len(latencies),
+        "mock_latency_s": args.latency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_turns_per_s": round(len(latencies) / elapsed, 2),
+        "p50_s": round(percentile(latencies, 50), 4),
+        "p95_s": round(percentile(latencies, 95), 4),
+        "p99_s": round(percentile(latencies, 99), 4),
+        "mean_s": round(statistics.fmean(latencies), 4) if latencies else 0.0,
+        "upstream_requests": server.request_count,
+        **extra,
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for key, value in results.items():
+            print(f"{key:>24}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Local stub of the Hugging Face Inference API for exercising the chatbot offline.
+
+Answers POSTs to any path with `[{"generated_text": ...}]`, or with a text-generation-inference
+style server-sent-events stream of tokens when the payload has `"stream": true`. The first `loading_responses`
+requests get a 503 "model is loading" reply with `estimated_time`, and `error_rate` of the
+remaining requests get a 500.
+
+Usage: python benchmarks/mock_inference_server.py --port 8765 --latency 0.2
+Point the chatbot at it with MODEL_API_URL=http://127.0.0.1:8765/model
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Non-ASCII on purpose: real servers send raw UTF-8 JSON, which clients must decode as such
+DEFAULT_REPLY = "JobSevak: Here are a few delivery jobs in Warangal paying ₹15,000 a month you could apply for. नमस्ते!"
+
+
+class _Server(ThreadingHTTPServer):
+    # Load tests open many connections at once; the default backlog of 5 drops SYNs
+    request_queue_size = 256
+    daemon_threads = True
+
+
+class MockInferenceServer:
+    """
+    Threaded stub server; use as a context manager or call start()/stop().
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, loading_responses=0,
+                 estimated_time=0.01, error_rate=0.0, reply=DEFAULT_REPLY, token_latency=0.0):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.loading_responses = loading_responses
+        self.estimated_time = estimated_time
+        self.error_rate = error_rate
+        self.reply = reply
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/model"
+
+    def _next_request(self):
+        with self._lock:
+            self.request_count += 1
+            return self.request_count
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, body):
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, text):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for word in text.split(" "):
+                        if server.token_latency:
+                            time.sleep(server.token_latency)
+                        event = {"token": {"text": word + " ", "special": False}, "generated_text": None}
+                        data = f"data:{json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8")
+                        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                        self.wfile.flush()
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stopped reading early, e.g. after a "User:" marker
+                    self.close_connection = True
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    payload = {}
+                number = server._next_request()
+                if server.latency:
+                    time.sleep(server.latency)
+                if number <= server.loading_responses:
+                    self._send_json(503, {"error": "Model is currently loading",
+                                          "estimated_time": server.estimated_time})
+                elif server.error_rate and random.random() < server.error_rate:
+                    self._send_json(500, {"error": "Internal server error"})
+                elif isinstance(payload, dict) and payload.get("stream"):
+                    self._send_stream(server.reply)
+                else:
+                    self._send_json(200, [{"generated_text": server.reply}])
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before replying")
+    parser.add_argument("--loading-responses", type=int, default=0, help="initial 503 loading replies")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 500 replies")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="seconds between streamed tokens")
+    args = parser.parse_args()
+    server = MockInferenceServer(args.host, args.port, args.latency, args.loading_responses,
+                                 error_rate=args.error_rate, token_latency=args.token_latency)
+    print(f"Mock inference server listening on {server.url}")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Benchmark suite: data load time, job query latency, prompt build time/size and end-to-end
+chat throughput on synthetic data, with the model API replaced by MockInferenceServer.
+
+Results are written as JSON (with the git commit and environment) so runs can be compared
+across commits; --compare reports the change against an earlier results file and exits
+non-zero when a metric regressed by more than --threshold.
+
+Usage:
+    python benchmarks/suite.py --scale medium --output results.json
+    python benchmarks/suite.py --scale medium --compare results.json
+    python benchmarks/suite.py --jobs 200000 --faqs 1000 --scenarios load query
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "app"))
+
+from mock_inference_server import MockInferenceServer  # noqa: E402
+from synthetic import FEED_DATE, write_data_dir  # noqa: E402
+
+SCALES = {
+    "small": {"jobs": 1_000, "faqs": 50, "cities": 20},
+    "medium": {"jobs": 100_000, "faqs": 1_000, "cities": 200},
+    "large": {"jobs": 1_000_000, "faqs": 10_000, "cities": 1_000},
+}
+SCENARIOS = ("load", "query", "prompt", "chat")
+QUERIES = ["How do I post a job?", "jobs in Warangal", "part-time jobs for women in Guntur",
+           "delivery jobs above 15k posted this week", "driver work with license in Nellore",
+           "what does premium listing cost", "full time work in Tirupati under 20000"]
+
+# Metrics where bigger is better; every other *_ms / *_s metric is a latency
+HIGHER_IS_BETTER = ("throughput_turns_per_s",)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples_ms):
+    return {"p50_ms": round(percentile(samples_ms, 50), 4),
+            "p95_ms": round(percentile(samples_ms, 95), 4),
+            "mean_ms": round(statistics.fmean(samples_ms), 4)}
+
+
+def time_calls(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def make_bot(store, token="benchmark"):
+    from chatbot import JobChatBot
+    from response_cache import ResponseCache
+    return JobChatBot(token, response_cache=ResponseCache(), data=store, backend="remote", today=FEED_DATE)
+
+
+def scenario_load(data_dir, args):
+    from data_store import load_snapshot
+    samples = time_calls(lambda: load_snapshot(data_dir, strict=True), args.load_repeat)
+    return {"load_s": round(min(samples) / 1000, 4), **summarize(samples)}
+
+
+def scenario_query(store, args):
+    bot = make_bot(store)
+    for query in QUERIES:  # warm-up
+        bot.get_job_data_context(query)
+    samples = []
+    for _ in range(args.repeat):
+        for query in QUERIES:
+            samples.extend(time_calls(lambda: bot.get_job_data_context(query), 1))
+    return summarize(samples)
+
+
+def scenario_prompt(store, args):
+    bot = make_bot(store)
+    for query in QUERIES:  # warm-up
+        bot.get_system_prompt_and_context(query)
+    samples, tokens, sizes = [], [], []
+    for _ in range(args.repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            prompt = bot.get_system_prompt_and_context(query)
+            samples.append((time.perf_counter() - start) * 1000)
+            tokens.append(sum(bot.last_prompt_usage.values()))
+            sizes.append(len(prompt.encode("utf-8")))
+    return {**summarize(samples), "prompt_tokens_mean": round(statistics.fmean(tokens), 1),
+            "prompt_bytes_mean": round(statistics.fmean(sizes), 1), "prompt_bytes_max": max(sizes)}
+
+
+def _chat_sync(store, users, turns, stream=False):
+    latencies, replies, lock = [], [], threading.Lock()
+
+    def session(user):
+        bot = make_bot(store)
+        for turn in range(turns):
+            query = f"{QUERIES[(user + turn) % len(QUERIES)]} (user {user})"
+            start = time.perf_counter()
+            reply = "".join(bot.chat_stream(query)) if stream else bot.chat(query)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                replies.append(reply)
+
+    threads = [threading.Thread(target=session, args=(user,)) for user in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, replies
+
+
+async def _chat_async(store, users, turns):
+    from async_client import get_async_inference_client
+    latencies, replies = [], []
+
+    async def session(user):
+        bot = make_bot(store)
+        for turn in range(turns):
+            start = time.perf_counter()
+            replies.append(await bot.achat(f"{QUERIES[(user + turn) % len(QUERIES)]} (user {user})"))
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(session(user) for user in range(users)))
+    await get_async_inference_client().close()
+    return latencies, replies
+
+
+def scenario_chat(store, args):
+    import inference_backend
+    from streaming import clean_reply
+    results = {}
+    with MockInferenceServer(latency=args.latency, loading_responses=args.loading_responses,
+                             error_rate=args.error_rate) as server:
+        inference_backend.MODEL_API_URL = server.url
+        # The mock reply has non-ASCII text; every mode must deliver it intact
+        expected = clean_reply(server.reply)
+        for mode in ("sync", "stream", "async"):
+            start = time.perf_counter()
+            if mode == "async":
+                latencies, replies = asyncio.run(_chat_async(store, args.users, args.turns))
+            else:
+                latencies, replies = _chat_sync(store, args.users, args.turns, stream=mode == "stream")
+            elapsed = time.perf_counter() - start
+            results[mode] = {
+                "throughput_turns_per_s": round(len(latencies) / elapsed, 2),
+                **summarize([latency * 1000 for latency in latencies]),
+                "garbled_replies": sum(reply != expected for reply in replies),
+            }
+        results["upstream_requests"] = server.request_count
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import numpy
+    return {"commit": commit, "python": platform.python_version(), "numpy": numpy.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")}
+
+
+def flatten(results, prefix=""):
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from flatten(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}", value
+
+
+def compare(current, baseline, threshold):
+    """
+    Print each timing/throughput metric against the baseline; return the regressed ones.
+    """
+    old = dict(flatten(baseline["results"]))
+    regressions = []
+    print(f"{'metric':<44} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, value in flatten(current["results"]):
+        higher_is_better = name.endswith(HIGHER_IS_BETTER)
+        if name not in old or not old[name] or not (higher_is_better or name.endswith(("_ms", "_s"))):
+            continue
+        change = value / old[name] - 1
+        worse = -change if higher_is_better else change
+        flag = "  REGRESSED" if worse > threshold else ""
+        print(f"{name:<44} {old[name]:>12} {value:>12} {change:>+8.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the JobSevak benchmark scenarios.")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--jobs", type=int, help="override the scale's job count")
+    parser.add_argument("--faqs", type=int, help="override the scale's FAQ count")
+    parser.add_argument("--cities", type=int, help="override the scale's city count")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=20, help="rounds over the query mix (query, prompt)")
+    parser.add_argument("--load-repeat", type=int, default=3)
+    parser.add_argument("--users", type=int, default=20, help="concurrent chat sessions (chat)")
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05, help="mock model latency in seconds")
+    parser.add_argument("--loading-responses", type=int, default=0, help="503 'loading' replies before answering")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of mock replies that are 500s")
+    parser.add_argument("--output", help="write the results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before flagging, e.g. 0.2")
+    args = parser.parse_args()
+
+    params = {name: getattr(args, name) if getattr(args, name) is not None else default
+              for name, default in SCALES[args.scale].items()}
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        start = time.perf_counter()
+        write_data_dir(data_dir, params["jobs"], params["faqs"], params["cities"])
+        print(f"Generated {params} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+        from data_store import DataStore
+        store = DataStore(data_dir)
+        runners = {"load": lambda: scenario_load(data_dir, args), "query": lambda: scenario_query(store, args),
+                   "prompt": lambda: scenario_prompt(store, args), "chat": lambda: scenario_chat(store, args)}
+        for name in args.scenarios:
+            print(f"Running {name}...", file=sys.stderr)
+            results[name] = runners[name]()
+
+    report = {"environment": environment(), "params": {**params, **{k: v for k, v in vars(args).items()
+                                                                      if k not in params and k not in ("output", "compare")}},
+              "results": results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Synthetic jobs, FAQs and cities for the benchmarks, at any scale.
+
+Everything is generated from a seeded random.Random, so the same arguments always give
+the same data. Job records have the same fields and value shapes as app/data/mock_jobs.json.
+"""
+import datetime
+import json
+import os
+import random
+
+CITIES = ["Warangal", "Guntur", "Tirupati", "Vijayawada", "Nellore", "Kurnool", "Eluru", "Khammam"]
+TITLES = ["Delivery Executive", "Receptionist", "Sales Executive", "Cashier", "Driver", "Security Guard"]
+DESCRIPTIONS = [
+    "Looking for reliable candidates. Must have a smartphone.",
+    "Deliver food and groceries on a two-wheeler in your area.",
+    "Handle customer calls and maintain records in Excel.",
+    "Drive company vehicles for staff pickup and drop.",
+    "Greet visitors and manage the front desk of a busy clinic.",
+]
+REQUIREMENTS = ["Smartphone", "10th Pass", "12th Pass", "Two-wheeler", "Valid driving license",
+                "Basic computer knowledge", "Good communication skills", "Typing speed 30 wpm"]
+SALARY_FORMATS = ["₹{low},000 - ₹{high},000 per month", "₹{low},000 per month", "₹{low},000 + Commission"]
+# Jobs are posted during June 2023; recency filters should count from this date
+FEED_DATE = datetime.date(2023, 6, 28)
+VOCABULARY = ("job post apply salary premium listing account phone resume document employer verify "
+              "payment refund shift location city women night interview profile notification search "
+              "filter save delete contact support app login password skill experience").split()
+
+
+def make_cities(count):
+    """
+    `count` city names: the real ones first, then "City 9", "City 10", ...
+    """
+    return CITIES[:count] + [f"City {i}" for i in range(len(CITIES), count)]
+
+
+def make_job(rng, i, cities=CITIES):
+    low = rng.randrange(8, 30)
+    return {
+        "id": f"job{i:08d}",
+        "title": rng.choice(TITLES),
+        "company": f"Company {rng.randrange(5000)}",
+        "location": rng.choice(cities),
+        "salary": rng.choice(SALARY_FORMATS).format(low=low, high=low + 3),
+        "description": rng.choice(DESCRIPTIONS),
+        "requirements": rng.sample(REQUIREMENTS, rng.randrange(1, 4)),
+        "job_type": rng.choice(["Full-time", "Part-time"]),
+        "posted_date": f"2023-06-{rng.randrange(1, 29):02d}",
+        "gender_preference": rng.choice(["Any", "Male", "Female"]),
+    }
+
+
+def iter_jobs(count, seed=0, cities=CITIES):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield make_job(rng, i, cities)
+
+
+def make_faqs(count, seed=0):
+    rng = random.Random(seed)
+    faqs = []
+    for i in range(count):
+        question = " ".join(rng.choices(VOCABULARY, k=6)) + f" topic{i}?"
+        answer = " ".join(rng.choices(VOCABULARY, k=30)) + "."
+        faqs.append({"question": question.capitalize(), "answer": answer.capitalize()})
+    return faqs
+
+
+def write_job_feeds(directory, count, seed=0, cities=CITIES):
+    """
+    Write the same synthetic jobs as mock_jobs.json and mock_jobs.jsonl, streaming to disk.
+    """
+    json_path = os.path.join(directory, "mock_jobs.json")
+    jsonl_path = os.path.join(directory, "mock_jobs.jsonl")
+    with open(json_path, "w", encoding="utf-8") as json_file, open(jsonl_path, "w", encoding="utf-8") as jsonl_file:
+        json_file.write('{"jobs": [\n')
+        for i, job in enumerate(iter_jobs(count, seed, cities)):
+            line = json.dumps(job, ensure_ascii=False)
+            json_file.write(("," if i else "") + line + "\n")
+            jsonl_file.write(line + "\n")
+        json_file.write("]}\n")
+    return json_path, jsonl_path
+
+
+def write_data_dir(path, jobs, faqs, cities=len(CITIES), seed=0):
+    """
+    Fill `path` with faqs.json, cities.json and mock_jobs.json in the app's data layout.
+    """
+    city_names = make_cities(cities)
+    for name, body in (("faqs.json", {"faqs": make_faqs(faqs, seed)}), ("cities.json", {"cities": city_names})):
+        with open(os.path.join(path, name), "w", encoding="utf-8") as f:
+            json.dump(body, f, ensure_ascii=False)
+    with open(os.path.join(path, "mock_jobs.json"), "w", encoding="utf-8") as f:
+        f.write('{"jobs": [\n')
+        for i, job in enumerate(iter_jobs(jobs, seed, city_names)):
+            f.write(("," if i else "") + json.dumps(job, ensure_ascii=False) + "\n")
+        f.write("]}\n")
+    return path
@@ -1,17 +1,36 @@
-import streamlit.web.cli as stcli
-import sys
-import os
-
-if __name__ == "__main__":
-    # Get the absolute path to the app/app.py file
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    app_path = os.path.join(current_dir, "app", "app.py")
-    
-    # Check if file exists
-    if not os.path.exists(app_path):
-        print(f"Error: Could not find {app_path}")
-        sys.exit(1)
-    
-    # Run the Streamlit app
-    sys.argv = ["streamlit", "run", app_path]
-    sys.exit(stcli.main()) 
\ No newline at end of file
+import streamlit.web.cli as stcli
+import argparse
+import subprocess
+import sys
+import os
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the JobSevak Streamlit app.")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="also start the API server with this many worker processes and use the UI as its thin client")
+    parser.add_argument("--api-port", type=int, default=int(os.getenv("JOBSEVAK_API_PORT", "8500")))
+    args = parser.parse_args()
+
+    # Get the absolute path to the app/app.py file
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    app_path = os.path.join(current_dir, "app", "app.py")
+
+    # Check if file exists
+    if not os.path.exists(app_path):
+        print(f"Error: Could not find {app_path}")
+        sys.exit(1)
+
+    api_server = None
+    if args.workers:
+        api_server = subprocess.Popen([sys.executable, os.path.join(current_dir, "app", "api_server.py"),
+                                       "--workers", str(args.workers), "--port", str(args.api_port)])
+        os.environ["JOBSEVAK_API_URL"] = f"http://127.0.0.1:{args.api_port}"
+
+    # Run the Streamlit app
+    sys.argv = ["streamlit", "run", app_path]
+    try:
+        sys.exit(stcli.main())
+    finally:
+        if api_server is not None:
+            api_server.terminate()
+            api_server.wait()